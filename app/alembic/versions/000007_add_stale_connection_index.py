@@ -0,0 +1,35 @@
+"""Add partial index for the stale connection sweep
+
+Revision ID: 000007
+Revises: 000006
+Create Date: 2026-10-17 10:03:18.227410
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "000007"
+down_revision: Union[str, None] = "000006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only active connections can go stale
+    op.create_index(
+        "ix_connection_active_last_heartbeat",
+        "connection",
+        ["last_heartbeat"],
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_connection_active_last_heartbeat", table_name="connection")
@@ -0,0 +1,161 @@
+"""Notify Event rows and game status for the JetStream event log
+
+Revision ID: 000008
+Revises: 000007
+Create Date: 2026-10-17 11:26:05.318842
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "000008"
+down_revision: Union[str, None] = "000007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Table is otherwise only created by Tortoise (generate_schemas), after migrations ran
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS event (
+            id SERIAL PRIMARY KEY,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            event_type VARCHAR(20) NOT NULL,
+            game_id INT NOT NULL REFERENCES game (id) ON DELETE CASCADE,
+            player_id INT REFERENCES player (id) ON DELETE SET NULL,
+            connection_id INT REFERENCES connection (id) ON DELETE SET NULL
+        );
+    """)
+
+    # Notify with "code:version:status" payloads (ended games are purged from the log)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_game_change() RETURNS TRIGGER AS $$
+        DECLARE
+            changed_game_id integer;
+            game_code varchar;
+            game_version integer;
+            game_status varchar;
+        BEGIN
+            -- Notify on connection changes (join, leave, is_active changes)
+            IF TG_TABLE_NAME = 'connection' THEN
+                IF TG_OP = 'DELETE' THEN
+                    changed_game_id := OLD.game_id;
+                ELSIF TG_OP = 'INSERT' THEN
+                    changed_game_id := NEW.game_id;
+                ELSIF OLD.is_active IS DISTINCT FROM NEW.is_active THEN
+                    changed_game_id := NEW.game_id;
+                END IF;
+
+                IF changed_game_id IS NOT NULL THEN
+                    -- Bump the game's version (the nested game trigger won't notify again)
+                    UPDATE game SET version = version + 1 WHERE id = changed_game_id
+                    RETURNING code, version, status INTO game_code, game_version, game_status;
+
+                    IF game_code IS NOT NULL THEN
+                        PERFORM pg_notify(
+                            'game_change', game_code || ':' || game_version || ':' || game_status
+                        );
+                    END IF;
+                END IF;
+
+                IF TG_OP = 'DELETE' THEN
+                    RETURN OLD;
+                END IF;
+                RETURN NEW;
+            END IF;
+
+            -- Notify on game changes (status, host changes)
+            IF TG_TABLE_NAME = 'game' THEN
+                -- Skip version bumps made by the connection branch above
+                IF pg_trigger_depth() = 1 THEN
+                    PERFORM pg_notify(
+                        'game_change', NEW.code || ':' || NEW.version || ':' || NEW.status
+                    );
+                END IF;
+                RETURN NEW;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Notify new Event rows as JSON
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_game_event() RETURNS TRIGGER AS $$
+        BEGIN
+            PERFORM pg_notify('game_event', json_build_object(
+                'id', NEW.id,
+                'game_code', (SELECT code FROM game WHERE id = NEW.game_id),
+                'event_type', NEW.event_type,
+                'player_id', NEW.player_id,
+                'connection_id', NEW.connection_id,
+                'created_at', NEW.created_at
+            )::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    op.execute("""
+        CREATE TRIGGER game_event_trigger
+        AFTER INSERT ON event
+        FOR EACH ROW
+        EXECUTE FUNCTION notify_game_event();
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS game_event_trigger ON event;")
+    op.execute("DROP FUNCTION IF EXISTS notify_game_event();")
+
+    # Restore "code:version" notifications
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_game_change() RETURNS TRIGGER AS $$
+        DECLARE
+            changed_game_id integer;
+            game_code varchar;
+            game_version integer;
+        BEGIN
+            IF TG_TABLE_NAME = 'connection' THEN
+                IF TG_OP = 'DELETE' THEN
+                    changed_game_id := OLD.game_id;
+                ELSIF TG_OP = 'INSERT' THEN
+                    changed_game_id := NEW.game_id;
+                ELSIF OLD.is_active IS DISTINCT FROM NEW.is_active THEN
+                    changed_game_id := NEW.game_id;
+                END IF;
+
+                IF changed_game_id IS NOT NULL THEN
+                    UPDATE game SET version = version + 1 WHERE id = changed_game_id
+                    RETURNING code, version INTO game_code, game_version;
+
+                    IF game_code IS NOT NULL THEN
+                        PERFORM pg_notify('game_change', game_code || ':' || game_version);
+                    END IF;
+                END IF;
+
+                IF TG_OP = 'DELETE' THEN
+                    RETURN OLD;
+                END IF;
+                RETURN NEW;
+            END IF;
+
+            IF TG_TABLE_NAME = 'game' THEN
+                IF pg_trigger_depth() = 1 THEN
+                    PERFORM pg_notify('game_change', NEW.code || ':' || NEW.version);
+                END IF;
+                RETURN NEW;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
@@ -0,0 +1,148 @@
+"""Carry the change itself in game_change notifications (JSON)
+
+Revision ID: 000009
+Revises: 000008
+Create Date: 2026-10-17 12:41:52.906114
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "000009"
+down_revision: Union[str, None] = "000008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Notify with JSON payloads describing the change, so listeners can apply it without a query:
+    #   {code, version, status, table, op, id, player_id, is_active, player: {name, avatar}}  (connection)
+    #   {code, version, status, table, op, id, host_id}                                      (game)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_game_change() RETURNS TRIGGER AS $$
+        DECLARE
+            changed connection%ROWTYPE;
+            game_code varchar;
+            game_version integer;
+            game_status varchar;
+        BEGIN
+            -- Notify on connection changes (join, leave, is_active changes)
+            IF TG_TABLE_NAME = 'connection' THEN
+                IF TG_OP = 'DELETE' THEN
+                    changed := OLD;
+                ELSIF TG_OP = 'INSERT' OR OLD.is_active IS DISTINCT FROM NEW.is_active THEN
+                    changed := NEW;
+                END IF;
+
+                IF changed.id IS NOT NULL THEN
+                    -- Bump the game's version (the nested game trigger won't notify again)
+                    UPDATE game SET version = version + 1 WHERE id = changed.game_id
+                    RETURNING code, version, status INTO game_code, game_version, game_status;
+
+                    IF game_code IS NOT NULL THEN
+                        PERFORM pg_notify('game_change', json_build_object(
+                            'code', game_code,
+                            'version', game_version,
+                            'status', game_status,
+                            'table', TG_TABLE_NAME,
+                            'op', TG_OP,
+                            'id', changed.id,
+                            'player_id', changed.player_id,
+                            'is_active', changed.is_active,
+                            -- New players aren't known to listeners yet
+                            'player', CASE WHEN TG_OP = 'INSERT' THEN (
+                                SELECT json_build_object('name', name, 'avatar', avatar)
+                                FROM player WHERE id = changed.player_id
+                            ) END
+                        )::text);
+                    END IF;
+                END IF;
+
+                IF TG_OP = 'DELETE' THEN
+                    RETURN OLD;
+                END IF;
+                RETURN NEW;
+            END IF;
+
+            -- Notify on game changes (status, host changes)
+            IF TG_TABLE_NAME = 'game' THEN
+                -- Skip version bumps made by the connection branch above
+                IF pg_trigger_depth() = 1 THEN
+                    PERFORM pg_notify('game_change', json_build_object(
+                        'code', NEW.code,
+                        'version', NEW.version,
+                        'status', NEW.status,
+                        'table', TG_TABLE_NAME,
+                        'op', TG_OP,
+                        'id', NEW.id,
+                        'host_id', NEW.host_id
+                    )::text);
+                END IF;
+                RETURN NEW;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Restore "code:version:status" notifications
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_game_change() RETURNS TRIGGER AS $$
+        DECLARE
+            changed_game_id integer;
+            game_code varchar;
+            game_version integer;
+            game_status varchar;
+        BEGIN
+            -- Notify on connection changes (join, leave, is_active changes)
+            IF TG_TABLE_NAME = 'connection' THEN
+                IF TG_OP = 'DELETE' THEN
+                    changed_game_id := OLD.game_id;
+                ELSIF TG_OP = 'INSERT' THEN
+                    changed_game_id := NEW.game_id;
+                ELSIF OLD.is_active IS DISTINCT FROM NEW.is_active THEN
+                    changed_game_id := NEW.game_id;
+                END IF;
+
+                IF changed_game_id IS NOT NULL THEN
+                    -- Bump the game's version (the nested game trigger won't notify again)
+                    UPDATE game SET version = version + 1 WHERE id = changed_game_id
+                    RETURNING code, version, status INTO game_code, game_version, game_status;
+
+                    IF game_code IS NOT NULL THEN
+                        PERFORM pg_notify(
+                            'game_change', game_code || ':' || game_version || ':' || game_status
+                        );
+                    END IF;
+                END IF;
+
+                IF TG_OP = 'DELETE' THEN
+                    RETURN OLD;
+                END IF;
+                RETURN NEW;
+            END IF;
+
+            -- Notify on game changes (status, host changes)
+            IF TG_TABLE_NAME = 'game' THEN
+                -- Skip version bumps made by the connection branch above
+                IF pg_trigger_depth() = 1 THEN
+                    PERFORM pg_notify(
+                        'game_change', NEW.code || ':' || NEW.version || ':' || NEW.status
+                    );
+                END IF;
+                RETURN NEW;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
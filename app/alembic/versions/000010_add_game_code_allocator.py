@@ -0,0 +1,79 @@
+"""Allocate game codes from a permuted sequence, unique among active games only
+
+Revision ID: 000010
+Revises: 000009
+Create Date: 2026-10-17 14:02:37.661289
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "000010"
+down_revision: Union[str, None] = "000009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One value per code (26^4), starting over once all were handed out
+    op.execute(
+        "CREATE SEQUENCE game_code_seq MINVALUE 0 MAXVALUE 456975 START 0 CYCLE;"
+    )
+
+    # Walk the sequence through an affine permutation (214013 is coprime to 26^4), so
+    # consecutive games get unrelated codes. Codes of active or recently ended games
+    # are skipped within the same call.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION next_game_code(cooldown interval DEFAULT interval '1 day')
+        RETURNS varchar AS $$
+        DECLARE
+            n bigint;
+            candidate varchar;
+        BEGIN
+            FOR attempt IN 1..1000 LOOP
+                n := (nextval('game_code_seq') * 214013 + 2531011) % 456976;
+                candidate := chr(65 + (n / 17576)::int % 26)
+                    || chr(65 + (n / 676)::int % 26)
+                    || chr(65 + (n / 26)::int % 26)
+                    || chr(65 + (n % 26)::int);
+
+                IF NOT EXISTS (
+                    SELECT 1 FROM game
+                    WHERE code = candidate
+                    AND (status::text NOT IN ('FINISHED', 'ABORTED') OR updated_at > NOW() - cooldown)
+                ) THEN
+                    RETURN candidate;
+                END IF;
+            END LOOP;
+
+            RAISE EXCEPTION 'No free game code';
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Codes are reused after games end - only active games need distinct codes
+    op.drop_constraint("game_code_key", "game", type_="unique")
+    op.create_index(
+        "uq_game_active_code",
+        "game",
+        ["code"],
+        unique=True,
+        postgresql_where=sa.text("status::text NOT IN ('FINISHED', 'ABORTED')"),
+    )
+    op.create_index("ix_game_code", "game", ["code"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_game_code", table_name="game")
+    op.drop_index("uq_game_active_code", table_name="game")
+    op.create_unique_constraint("game_code_key", "game", ["code"])
+
+    op.execute("DROP FUNCTION IF EXISTS next_game_code(interval);")
+    op.execute("DROP SEQUENCE IF EXISTS game_code_seq;")
@@ -0,0 +1,287 @@
+"""
+Postgres -> NATS bridge for game change notifications.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+import asyncpg
+from nats.aio.client import Client as NATS
+from tortoise import connections
+
+from app.config import settings
+from app.event_log import GameEventLog
+from app.leader import LeaderElection
+from app.models import Game
+
+logger = logging.getLogger(__name__)
+
+BRIDGE_LOCK_KEY = 727_002
+"""Advisory lock key electing the worker that runs the bridge."""
+
+GAME_ENDED_STATUSES = (Game.Status.FINISHED, Game.Status.ABORTED)
+
+
+@dataclass
+class BridgeStats:
+    """Counters exposed for monitoring."""
+
+    received: int = 0
+    """Notifications received from Postgres."""
+
+    published: int = 0
+    """Messages published to NATS."""
+
+    collapsed: int = 0
+    """Notifications merged into an already pending publish."""
+
+    events: int = 0
+    """`Event` rows appended to the event log."""
+
+    purged: int = 0
+    """Finished games dropped from the event log."""
+
+    connected: bool = False
+    """Whether the LISTEN connection is up."""
+
+    is_leader: bool = True
+    """Whether this worker is the one forwarding notifications."""
+
+    reconnects: int = 0
+    """Times the LISTEN connection was re-established."""
+
+    listener_lag: float | None = None
+    """Seconds for the last probe notification to reach the listener."""
+
+
+class GameChangeBridge:
+    """
+    Forwards Postgres `game_change` notifications (JSON changes) to NATS (`game.{code}`).
+
+    Notifications for the same game within `coalesce_window` seconds are merged into a
+    single publish, sent at the end of the window. A burst (e.g. a whole room joining)
+    costs one refresh instead of one per row.
+
+    Messages are JSON: {"version": latest, "status": latest, "changes": [change, ...]}, with
+    changes ordered by version, or null when unknown (subscribers have to reload the game).
+
+    With an `election`, only the elected worker listens, so each change is published once
+    instead of once per worker. Whoever takes over republishes all active games, covering
+    changes made between the old leader dying and the lock being released.
+
+    With an `event_log`, `Event` rows (`game_event` channel) are appended to it as well,
+    and games are purged from it once they end.
+    """
+
+    def __init__(
+        self,
+        nats_connection: NATS,
+        *,
+        coalesce_window: float = 0.0,
+        election: LeaderElection | None = None,
+        event_log: GameEventLog | None = None,
+        probe_interval: float = 10.0,
+        probe_timeout: float = 5.0,
+        max_backoff: float = 30.0,
+    ):
+        self.nats_connection = nats_connection
+        self.coalesce_window = coalesce_window
+        self.election = election
+        self.event_log = event_log
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.max_backoff = max_backoff
+        self.stats = BridgeStats()
+
+        self._probe_payload: str | None = None
+        self._probe_received = asyncio.Event()
+        self._probe_count = 0
+
+        self._pending: dict[str, list[dict]] = {}
+        """Changes of each game waiting to be published."""
+
+        self._tasks: set[asyncio.Task] = set()
+
+    async def run(self) -> None:
+        """
+        Keep a LISTEN connection open (until cancelled).
+
+        A dropped connection is re-established with exponential backoff, after which
+        changes for all active games are republished, to cover those missed while down.
+        The connection is probed regularly, which both measures listener lag and detects
+        connections that died silently.
+        """
+        backoff = 1.0
+
+        while True:
+            if not self._should_listen():
+                await asyncio.sleep(self.election.retry_interval)
+                continue
+
+            try:
+                connection = await asyncpg.connect(settings.DATABASE_URL)
+            except Exception as e:
+                logger.warning(
+                    "Connecting game change listener failed (retry in %ss): %s",
+                    backoff,
+                    e,
+                )
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+
+            failed = False
+            try:
+                await connection.add_listener("game_change", self.on_notification)
+                await connection.add_listener("game_change_probe", self._on_probe)
+                if self.event_log is not None:
+                    await connection.add_listener("game_event", self.on_event)
+                self.stats.connected = True
+                backoff = 1.0
+
+                if self.stats.reconnects or self.election is not None:
+                    await self.catch_up()
+
+                while self._should_listen() and not connection.is_closed():
+                    await self._probe()
+                    await asyncio.sleep(self._poll_interval)
+
+                if not connection.is_closed():
+                    continue  # Stepped down, not a reconnect
+
+            except Exception:
+                # Also NATS or ORM errors from catching up / probing - never end the loop
+                logger.exception("Game change listener failed (retry in %ss)", backoff)
+                failed = True
+            finally:
+                self.stats.connected = False
+                connection.terminate()
+
+            self.stats.reconnects += 1
+            if failed:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def catch_up(self) -> None:
+        """Republish the current version of every active game."""
+        games = await Game.filter(
+            status__in=[Game.Status.IN_LOBBY, Game.Status.IN_PROGRESS]
+        ).values_list("code", "version", "status")
+
+        for game_code, version, status in games:
+            await self._publish(game_code, version, status, changes=None)
+
+    @property
+    def _poll_interval(self) -> float:
+        if self.election is None:
+            return self.probe_interval
+        # Notice a lost election quickly, to keep duplicates short
+        return min(self.probe_interval, self.election.retry_interval)
+
+    def _should_listen(self) -> bool:
+        self.stats.is_leader = self.election is None or self.election.is_leader
+        return self.stats.is_leader
+
+    def on_notification(
+        self, conn: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        """asyncpg listener for the `game_change` channel."""
+        self.stats.received += 1
+
+        change = parse_game_change(payload)
+        game_code = change.pop("code")
+
+        if game_code in self._pending:
+            self.stats.collapsed += 1
+            self._pending[game_code].append(change)
+            return
+
+        self._pending[game_code] = [change]
+
+        if self.coalesce_window <= 0:
+            self._flush(game_code)
+            return
+
+        asyncio.get_running_loop().call_later(
+            self.coalesce_window, self._flush, game_code
+        )
+
+    def on_event(
+        self, conn: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        """asyncpg listener for the `game_event` channel (JSON `Event` rows)."""
+        event = json.loads(payload)
+        self._spawn(self._append_event(event.pop("game_code"), event))
+
+    async def close(self) -> None:
+        """Publish whatever is still pending and wait for in-flight publishes."""
+        for game_code in list(self._pending):
+            self._flush(game_code)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _probe(self) -> None:
+        """Send a notification from another session and wait for it to arrive."""
+        self._probe_count += 1
+        self._probe_payload = f"{os.getpid()}:{self._probe_count}"
+        self._probe_received.clear()
+
+        sent_at = time.monotonic()
+        await connections.get("default").execute_query(
+            "SELECT pg_notify('game_change_probe', $1)", [self._probe_payload]
+        )
+        await asyncio.wait_for(self._probe_received.wait(), self.probe_timeout)
+
+        self.stats.listener_lag = time.monotonic() - sent_at
+
+    def _on_probe(
+        self, conn: asyncpg.Connection, pid: int, channel: str, payload: str
+    ) -> None:
+        # Every worker listens - only count our own probe
+        if payload == self._probe_payload:
+            self._probe_received.set()
+
+    def _flush(self, game_code: str) -> None:
+        if (changes := self._pending.pop(game_code, None)) is None:
+            return  # Already flushed (on close)
+
+        # Notifications of concurrent transactions may arrive out of order
+        changes.sort(key=lambda change: change["version"])
+        latest = changes[-1]
+
+        self._spawn(
+            self._publish(game_code, latest["version"], latest["status"], changes)
+        )
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _publish(
+        self, game_code: str, version: int, status: str, changes: list[dict] | None
+    ) -> None:
+        message = {"version": version, "status": status, "changes": changes}
+        await self.nats_connection.publish(
+            f"game.{game_code}", json.dumps(message).encode()
+        )
+        self.stats.published += 1
+
+        # Nobody replays an ended game - free its share of the stream
+        if self.event_log is not None and status in GAME_ENDED_STATUSES:
+            await self.event_log.purge(game_code)
+            self.stats.purged += 1
+
+    async def _append_event(self, game_code: str, event: dict) -> None:
+        await self.event_log.append_event(game_code, event)
+        self.stats.events += 1
+
+
+def parse_game_change(payload: str) -> dict:
+    """Parse a `game_change` notification payload (see migration 000009 for its fields)."""
+    return json.loads(payload)
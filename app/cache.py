@@ -0,0 +1,174 @@
+"""
+Per-worker caches of games (with host and player connections) and session players.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.models import Game, Player
+
+
+class CachedGame:
+    """A cache entry: the assembled game, and whether changes are being applied to it."""
+
+    __slots__ = ("game", "live")
+
+    def __init__(self, game: Game, live: bool):
+        self.game = game
+        self.live = live
+
+
+class CachedPlayer:
+    """A cache entry: the session's player, and when it stops being served."""
+
+    __slots__ = ("player", "expires_at")
+
+    def __init__(self, player: Player, expires_at: float):
+        self.player = player
+        self.expires_at = expires_at
+
+
+@dataclass
+class CacheStats:
+    """Counters exposed for monitoring."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class GameCache:
+    """
+    Keeps recently used games in memory, as loaded by `Game.get_by_code`.
+
+    Entries are only served while they are live, i.e. while the hub has a subscription for
+    the game and keeps the entry current with every `game_change` (see `GameHub`). Other
+    games are loaded from the database on every read, as they'd go stale unnoticed.
+    At most `max_entries` games are kept, least recently used are evicted first.
+
+    Cached games are shared between requests - treat them as read-only.
+
+    Example:
+        game = await cache.get(game_code)
+    """
+
+    def __init__(self, *, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, CachedGame] = OrderedDict()
+        self._watched: set[str] = set()
+
+    async def get(self, game_code: str) -> Game | None:
+        """Get a game by code, from memory if it's kept current."""
+        game_code = game_code.upper()
+
+        entry = self._entries.get(game_code)
+        if entry is not None and entry.live:
+            self.stats.hits += 1
+            self._entries.move_to_end(game_code)
+            return entry.game
+
+        self.stats.misses += 1
+        game = await Game.get_by_code(game_code)
+        if game is not None:
+            self.put(game)
+        return game
+
+    def peek(self, game_code: str) -> Game | None:
+        """Get the cached game without loading it (live or not)."""
+        entry = self._entries.get(game_code)
+        return entry.game if entry is not None else None
+
+    def put(self, game: Game) -> None:
+        """Store the game, unless a newer version is already cached."""
+        entry = self._entries.get(game.code)
+
+        if entry is None:
+            self._entries[game.code] = CachedGame(game, live=game.code in self._watched)
+            self._evict()
+        elif game.version >= entry.game.version:
+            entry.game = game
+            self._entries.move_to_end(game.code)
+
+    def watch(self, game_code: str) -> None:
+        """Changes to the game are applied from now on, so its entry can be served."""
+        self._watched.add(game_code)
+        # May have gone stale while unwatched
+        self._entries.pop(game_code, None)
+
+    def unwatch(self, game_code: str) -> None:
+        """Changes to the game are no longer applied."""
+        self._watched.discard(game_code)
+        if (entry := self._entries.get(game_code)) is not None:
+            entry.live = False
+
+    def invalidate_player(self, player_id: int) -> None:
+        """Forget the games the player is in (e.g. after their name or avatar changed)."""
+        stale = [
+            game_code
+            for game_code, entry in self._entries.items()
+            if entry.game.host_id == player_id
+            or any(c.player_id == player_id for c in entry.game.connections)
+        ]
+        # Watched ones are reloaded on their next change
+        for game_code in stale:
+            del self._entries[game_code]
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+
+PLAYER_CHANGED_SUBJECT = "player.changed"
+"""NATS subject broadcasting players that changed, as `{"session_id": ..., "player_id": ...}`."""
+
+
+class PlayerCache:
+    """
+    Keeps the players of recent sessions in memory, so identifying a request needs no query.
+
+    Entries expire after `ttl` seconds, which bounds how long a change made on another
+    worker can go unnoticed (changes are also broadcast, see `invalidate`). At most
+    `max_entries` sessions are kept, least recently used are evicted first.
+
+    Example:
+        player = await cache.get(session_id)
+    """
+
+    def __init__(self, *, ttl: float = 60.0, max_entries: int = 10_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, CachedPlayer] = OrderedDict()
+
+    async def get(self, session_id: str) -> Player | None:
+        """Get the session's player, from memory if cached recently."""
+        now = time.monotonic()
+
+        entry = self._entries.get(session_id)
+        if entry is not None and entry.expires_at > now:
+            self.stats.hits += 1
+            self._entries.move_to_end(session_id)
+            return entry.player
+
+        self.stats.misses += 1
+        player = await Player.get_or_none(session_id=session_id)
+
+        # Sessions without a player yet are about to create one - don't cache those
+        if player is None:
+            self._entries.pop(session_id, None)
+            return None
+
+        self._entries[session_id] = CachedPlayer(player, now + self.ttl)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+        return player
+
+    def invalidate(self, session_id: str) -> None:
+        """Forget the session's player (e.g. after its name or avatar changed)."""
+        self._entries.pop(session_id, None)
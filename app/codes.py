@@ -0,0 +1,52 @@
+"""
+Allocation of short game codes.
+"""
+
+import asyncio
+
+from tortoise import connections
+
+from app.config import settings
+
+
+class GameCodeAllocator:
+    """
+    Hands out game codes reserved in batches from the database.
+
+    Codes come from `next_game_code()` (see migration 000010), which walks a permutation of
+    all 26^4 codes and skips those of active or recently ended games. Every code is only
+    ever reserved once per cycle, so creating a game never collides or retries.
+
+    Example:
+        code = await game_codes.next()
+    """
+
+    def __init__(self, *, batch_size: int = 20, cooldown: float = 24 * 60 * 60):
+        self.batch_size = batch_size
+        self.cooldown = cooldown
+        self._codes: list[str] = []
+        self._lock = asyncio.Lock()
+
+    async def next(self) -> str:
+        """Take a free code (reserving a new batch if none is left)."""
+        async with self._lock:
+            if not self._codes:
+                self._codes = await self._reserve()
+            return self._codes.pop()
+
+    async def _reserve(self) -> list[str]:
+        rows = await connections.get("default").execute_query_dict(
+            """
+            SELECT next_game_code(make_interval(secs => $1)) AS code
+            FROM generate_series(1, $2)
+            """,
+            [self.cooldown, self.batch_size],
+        )
+        # Hand out in reservation order
+        return [row["code"] for row in reversed(rows)]
+
+
+game_codes = GameCodeAllocator(
+    batch_size=settings.GAME_CODE_BATCH_SIZE, cooldown=settings.GAME_CODE_COOLDOWN
+)
+"""Allocator used by `Game.create` (one per worker)."""
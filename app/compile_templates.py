@@ -0,0 +1,16 @@
+"""
+Precompile the templates at build time (see `TEMPLATES_COMPILED_DIR`).
+
+Usage:
+    python -m app.compile_templates app/templates /opt/templates
+"""
+
+import sys
+
+from app.fasthtml import compile_templates
+
+
+if __name__ == "__main__":
+    source, target = sys.argv[1:3]
+    compile_templates(source, target)
+    print(f"Compiled templates from {source} into {target}")
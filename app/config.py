@@ -21,6 +21,8 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     DEBUG: bool
     ALLOWED_HOSTS: str = "*"
+    BASE_URL: str | None = None
+    """Public URL of the site, for absolute links rendered outside of requests (e.g. broadcasts)."""
 
     # Directories
     # --------------------
@@ -28,6 +30,8 @@ class Settings(BaseSettings):
     MEDIA_DIR: Path = BASE_DIR / "media"
     STATIC_DIR: Path = BASE_DIR / "app" / "static"
     TEMPLATES_DIR: Path = BASE_DIR / "app" / "templates"
+    TEMPLATES_COMPILED_DIR: Path | None = None
+    """Templates precompiled at build time (`python -m app.compile_templates`), if any."""
 
     # Database
     # --------------------
@@ -69,9 +73,70 @@ class Settings(BaseSettings):
             },
         }
 
+    # Presence
+    # --------------------
+    PRESENCE_HEARTBEAT_INTERVAL: float = 5.0
+    """Seconds between server-side heartbeats of connections with an open live stream."""
+    HEARTBEAT_FLUSH_INTERVAL: float = 2.0
+    """Seconds between bulk writes of buffered heartbeats."""
+    SSE_PING_INTERVAL: int = 10
+    """Seconds between SSE keepalive pings (detects dropped clients)."""
+    CONNECTION_STALE_AFTER: float = 15.0
+    """Seconds without a (written) heartbeat before a connection is marked inactive."""
+    CONNECTION_SWEEP_INTERVAL: float = 5.0
+    """Seconds between stale connection sweeps (run by one elected worker)."""
+    LEADER_ELECTION_INTERVAL: float = 5.0
+    """Seconds between attempts to become leader for singleton background jobs."""
+
+    # Live updates
+    # --------------------
+    GAME_REFRESH_MODE: Literal["full", "delta"] = "delta"
+    """Send the whole `game_state` block on every change, or only the changed fragments (out-of-band swaps)."""
+    GAME_TRANSPORT: Literal["sse", "ws"] = "sse"
+    """How the game page receives updates: SSE (+ POSTs for actions), or one WebSocket for everything."""
+
+    # Caches
+    # --------------------
+    GAME_CACHE_MAX_ENTRIES: int = 1000
+    """Games kept in memory per worker (only served while the worker follows their changes)."""
+    PLAYER_CACHE_TTL: float = 60.0
+    """Seconds a session's player is served from memory (changes on other workers are also broadcast)."""
+    PLAYER_CACHE_MAX_ENTRIES: int = 10_000
+    """Session players kept in memory per worker."""
+    TEMPLATE_FRAGMENT_CACHE_MAX_ENTRIES: int = 5000
+    """Rendered `{% cache %}` fragments kept in memory per worker (not cached in DEBUG)."""
+
+    # Games
+    # --------------------
+    GAME_CODE_BATCH_SIZE: int = 20
+    """Game codes reserved per database round trip (per worker)."""
+    GAME_CODE_COOLDOWN: float = 24 * 60 * 60
+    """Seconds before the code of an ended game can be handed out again."""
+
+    # Events
+    # --------------------
+    EVENT_OUTBOX_FLUSH_INTERVAL: float = 0.2
+    """Seconds between bulk inserts of events queued by model hooks."""
+
     # NATS
     # --------------------
     NATS_URL: str = "nats://nats:4222"
+    GAME_CHANGE_COALESCE_WINDOW: float = 0.1
+    """Seconds to merge `game_change` notifications for the same game into one publish (0 disables)."""
+    GAME_CHANGE_BRIDGE_MODE: Literal["elected", "all"] = "elected"
+    """Whether one elected worker forwards `game_change` notifications, or every worker does."""
+    BRIDGE_PROBE_INTERVAL: float = 10.0
+    """Seconds between probes of the LISTEN connection (measures lag, detects dead connections)."""
+    BRIDGE_PROBE_TIMEOUT: float = 5.0
+    """Seconds to wait for a probe before reconnecting."""
+    BRIDGE_MAX_RECONNECT_BACKOFF: float = 30.0
+    """Upper bound of the exponential backoff between LISTEN reconnect attempts."""
+    GAME_EVENT_LOG_ENABLED: bool = True
+    """Keep recent game changes and events in a JetStream stream (needs `nats -js`)."""
+    GAME_EVENT_LOG_MAX_PER_GAME: int = 100
+    """Messages retained per game and subject in the event log."""
+    GAME_EVENT_LOG_MAX_AGE: float = 6 * 60 * 60
+    """Seconds messages are retained in the event log."""
 
     # Monitoring
     # --------------------
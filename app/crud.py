@@ -1,9 +1,6 @@
-from datetime import datetime
-
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 
 from main.enums import GameStatus
 from main.models import Game, Player, PlayerConnection
@@ -115,64 +112,4 @@ async def get_user_active_games(db: AsyncSession, *, session_key: str) -> list[G
 # --- UPDATE ---
 
 
-async def update_player_connection_heartbeat(
-    db: AsyncSession, *, connection: PlayerConnection
-) -> bool:
-    """Update connection's heartbeat and reactivate if needed. Returns True if connection status changed."""
-    was_active = connection.is_active
-    connection.last_heartbeat = datetime.now()
-
-    # Only commit if connection status changed (reactivation)
-    if not was_active:
-        connection.is_active = True
-        connection.updated_at = datetime.now()
-        connection.activity_changed_at = datetime.now()
-        await db.commit()
-        return True  # Connection status changed
-    else:
-        await db.commit()
-        return False  # No status change
-
-
-async def mark_stale_connections_as_inactive(db: AsyncSession, *, game: Game) -> None:
-    """Find connections with stale heartbeats and mark them as inactive."""
-    try:
-        # First, let's see what connections exist in this game
-        check_result = await db.execute(
-            text("""
-            SELECT c.id, p.name, c.is_active, c.last_heartbeat, 
-                   NOW() - c.last_heartbeat as time_since_heartbeat
-            FROM connection c
-            JOIN player p ON c.player_id = p.id
-            WHERE c.game_id = :game_id
-            """),
-            {"game_id": game.id},
-        )
-        connections_info = check_result.fetchall()
-        print(
-            f"Connections in game {game.code}: {[(c.name, c.is_active, c.time_since_heartbeat) for c in connections_info]}"
-        )
-
-        # Now do the actual update
-        result = await db.execute(
-            text("""
-            UPDATE connection 
-            SET is_active = false, updated_at = NOW(), activity_changed_at = NOW()
-            WHERE game_id = :game_id 
-            AND is_active = true
-            AND last_heartbeat < NOW() - INTERVAL '5 seconds'
-            """),
-            {"game_id": game.id},
-        )
-        print(
-            f"Disconnection check for game {game.code}: {result.rowcount} connections marked as inactive"
-        )
-        if result.rowcount > 0:
-            await db.commit()
-            print(f"Committed disconnection changes for game {game.code}")
-    except Exception as e:
-        print(f"ERROR in mark_stale_heartbeat_connections_as_inactive: {e}")
-        raise
-
-
 # --- DELETE ---
@@ -2,7 +2,14 @@
 # FastAPI dependencies for roast-roulette application.
 # """
 from fastapi import Request, Depends, HTTPException, status
+from starlette.requests import HTTPConnection
 import uuid
+import copy
+
+from app.cache import GameCache, PlayerCache
+from app.heartbeats import HeartbeatBuffer
+from app.hub import GameHub
+from app.models import Game, Player, PlayerGameConnection
 
 
 # =============================================================================
@@ -10,9 +17,9 @@ import uuid
 # =============================================================================
 
 
-async def get_session_id(request: Request) -> str:
+async def get_session_id(request: HTTPConnection) -> str:
     """
-    Ensures a session exists for the current request.
+    Ensures a session exists for the current request (or WebSocket).
     """
 
     if "session_id" not in request.session:
@@ -21,13 +28,21 @@ async def get_session_id(request: Request) -> str:
     return request.session["session_id"]
 
 
+async def get_player_cache(request: HTTPConnection) -> PlayerCache:
+    """
+    Gets this worker's session player cache (created in lifespan).
+    """
+    return request.app.state.player_cache
+
+
 async def get_current_player(
     session_id: str = Depends(get_session_id),
+    cache: PlayerCache = Depends(get_player_cache),
 ) -> Player:
     """
-    Gets player associated with the current session.
+    Gets player associated with the current session (cached per worker).
     """
-    player = await Player.get(session_id=session_id)
+    player = await cache.get(session_id)
 
     if not player:
         raise HTTPException(
@@ -37,93 +52,107 @@ async def get_current_player(
     return player
 
 
-# # =============================================================================
-# # NATS DEPENDENCIES
-# # =============================================================================
-#
-# _nats_connection: NATS | None = None
-#
-#
-# async def get_nats_connection(request: Request) -> NATS:
-#     """NATS connection dependency."""
-#
-#     if _nats_connection is None:
-#         _nats_connection = await nats.connect(settings.NATS_URL)
-#     return _nats_connection
-#
-#
-# # =============================================================================
-# # GAME DEPENDENCIES
-# # =============================================================================
-#
-#
-# def find_player_connection_by_session_key(
-#     game: Game, session_key: str
-# ) -> PlayerConnection | None:
-#     """Find a player connection in the game by session key."""
-#     return next(
-#         (conn for conn in game.connections if conn.player.session_key == session_key),
-#         None,
-#     )
-#
-#
-# async def get_current_game(
-#     request: Request,
-#     db: AsyncSession = Depends(get_database_session),
-# ) -> Game:
-#     """
-#     Validates game exists and is accessible.
-#     Handles game_code from both path parameters and form data to avoid duplicating validation logic.
-#     Throws appropriate HTTP exceptions for invalid cases.
-#     """
-#     # Try path parameter first
-#     game_code = request.path_params.get("game_code")
-#
-#     # If not found, try form data
-#     if not game_code:
-#         form = await request.form()
-#         game_code = form.get("game_code")
-#
-#     if not game_code:
-#         raise HTTPException(status_code=400, detail="game_code required")
-#
-#     # Validate game exists
-#     game = await get_game_by_code(db, code=game_code)
-#     if not game:
-#         raise HTTPException(status_code=404, detail="Game not found")
-#
-#     # Check if game is finished
-#     if game.is_finished:
-#         raise HTTPException(status_code=410, detail="Game has ended")
-#
-#     return game
-#
-#
-#
-#
-# async def get_current_player_connection(
-#     game: Game = Depends(get_current_game),
-#     player: Player = Depends(get_current_player),
-# ) -> PlayerConnection:
-#     """
-#     Gets the current player's connection to the current game.
-#     Validates that the player is actually in the game by finding their connection.
-#     """
-#     connection = find_player_connection_by_session_key(game, player.session_key)
-#
-#     if not connection:
-#         # User is not a player in this game
-#         if game.is_in_progress:
-#             raise HTTPException(
-#                 status_code=403, detail="Game already started and you are not a player"
-#             )
-#         else:
-#             # Redirect to join form with game code
-#             redirect_url = f"/join?game_code={game.code}"
-#             raise HTTPException(
-#                 status_code=307,
-#                 detail="Redirect to join",
-#                 headers={"HX-Location": redirect_url},
-#             )
-#
-#     return connection
+# =============================================================================
+# WORKER STATE DEPENDENCIES
+# =============================================================================
+
+
+async def get_game_hub(request: HTTPConnection) -> GameHub:
+    """
+    Gets this worker's game hub (created in lifespan).
+    """
+    return request.app.state.game_hub
+
+
+async def get_game_cache(request: HTTPConnection) -> GameCache:
+    """
+    Gets this worker's game cache (created in lifespan).
+    """
+    return request.app.state.game_cache
+
+
+async def get_heartbeat_buffer(request: HTTPConnection) -> HeartbeatBuffer:
+    """
+    Gets this worker's heartbeat buffer (created in lifespan).
+    """
+    return request.app.state.heartbeats
+
+
+# =============================================================================
+# GAME DEPENDENCIES
+# =============================================================================
+
+
+def find_player_connection(game: Game, player: Player) -> PlayerGameConnection | None:
+    """Find a player's connection in the game."""
+    return next(
+        (conn for conn in game.connections if conn.player_id == player.id),
+        None,
+    )
+
+
+async def get_current_game(
+    request: HTTPConnection, game_cache: GameCache = Depends(get_game_cache)
+) -> Game:
+    """
+    Validates game exists and is accessible.
+    Handles game_code from both path parameters and form data to avoid duplicating validation logic.
+    Throws appropriate HTTP exceptions for invalid cases.
+    """
+    # Try path parameter first
+    game_code = request.path_params.get("game_code")
+
+    # If not found, try form data
+    if not game_code and isinstance(request, Request):
+        form = await request.form()
+        game_code = form.get("game_code")
+
+    if not game_code:
+        raise HTTPException(status_code=400, detail="game_code required")
+
+    # Validate game exists (from memory while this worker follows its changes)
+    game = await game_cache.get(game_code)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    # Check if game is finished
+    if game.is_finished:
+        raise HTTPException(status_code=410, detail="Game has ended")
+
+    return game
+
+
+async def get_current_player_connection(
+    game: Game = Depends(get_current_game),
+    player: Player = Depends(get_current_player),
+) -> PlayerGameConnection:
+    """
+    Gets the current player's connection to the current game.
+    Validates that the player is actually in the game by finding their connection.
+    """
+    connection = find_player_connection(game, player)
+
+    if not connection:
+        # User is not a player in this game
+        if game.is_in_progress:
+            raise HTTPException(
+                status_code=403, detail="Game already started and you are not a player"
+            )
+        else:
+            # Redirect to join form with game code
+            redirect_url = f"/join?game_code={game.code}"
+            raise HTTPException(
+                status_code=307,
+                detail="Redirect to join",
+                headers={"HX-Location": redirect_url},
+            )
+
+    # Cached game is shared - the connection is changed by presence tracking
+    connection = copy.copy(connection)
+    connection._take_snapshot()  # Compare its saves against its own state
+
+    # Reuse the already loaded game (with its connections) instead of fetching it again.
+    # It's shared too - change copies of it, never the game itself.
+    connection.game = game
+
+    return connection
@@ -0,0 +1,116 @@
+"""
+JetStream-backed log of recent game changes and events.
+"""
+
+import asyncio
+import json
+
+from nats.aio.client import Client as NATS
+from nats.js.api import DeliverPolicy, StorageType
+from nats.js.errors import BadRequestError, NotFoundError
+
+
+class GameEventLog:
+    """
+    Keeps the recent tail of every game in a memory-backed JetStream stream.
+
+    Subjects (both captured by the `game.>` stream):
+        game.{code}         Game changes, as JSON (also received by core subscribers)
+        game.{code}.events  `Event` rows, as JSON
+
+    Retention is bounded per subject (`max_per_game`) and by age. Finished games are purged.
+
+    Example:
+        log = GameEventLog(nats_connection, max_per_game=100, max_age=3600)
+        await log.setup()
+        version = await log.last_version(game.code)
+        changes = await log.replay_changes(game.code, since_version=game.version)
+    """
+
+    STREAM = "GAMES"
+
+    def __init__(self, nats_connection: NATS, *, max_per_game: int, max_age: float):
+        self.js = nats_connection.jetstream()
+        self.max_per_game = max_per_game
+        self.max_age = max_age
+
+    async def setup(self) -> None:
+        """Create the stream, or update its limits (every worker does this on start)."""
+        config = dict(
+            name=self.STREAM,
+            subjects=["game.>"],
+            storage=StorageType.MEMORY,
+            max_msgs_per_subject=self.max_per_game,
+            max_age=self.max_age,
+        )
+        try:
+            await self.js.add_stream(**config)
+        except BadRequestError:
+            # Already exists with other limits
+            await self.js.update_stream(**config)
+
+    async def append_event(self, game_code: str, event: dict) -> None:
+        """Append an `Event` row to the game's log."""
+        await self.js.publish(
+            f"game.{game_code}.events", json.dumps(event).encode(), stream=self.STREAM
+        )
+
+    async def last_version(self, game_code: str) -> int:
+        """Latest game version published, or 0 if none is retained."""
+        try:
+            msg = await self.js.get_last_msg(self.STREAM, f"game.{game_code}")
+        except NotFoundError:
+            return 0
+        return json.loads(msg.data)["version"]
+
+    async def replay_changes(
+        self, game_code: str, *, since_version: int, timeout: float = 1.0
+    ) -> list[dict] | None:
+        """
+        Retained changes of the game newer than `since_version`, oldest first.
+
+        Returns None if the tail doesn't have them all, i.e. a change was published without
+        its changes (e.g. by a catch-up) or the log can't be read in time.
+        """
+        subject = f"game.{game_code}"
+
+        try:
+            last = await self.js.get_last_msg(self.STREAM, subject)
+        except NotFoundError:
+            return None
+        if json.loads(last.data)["version"] <= since_version:
+            return []
+
+        subscription = await self.js.subscribe(
+            subject,
+            stream=self.STREAM,
+            ordered_consumer=True,
+            deliver_policy=DeliverPolicy.ALL,
+        )
+        version = since_version
+        changes = []
+        try:
+            while True:
+                msg = await subscription.next_msg(timeout=timeout)
+                message = json.loads(msg.data)
+
+                # Skip what's already known (and repeats, e.g. catch-ups)
+                if message["version"] > version:
+                    if message["changes"] is None:
+                        return None
+                    changes.extend(message["changes"])
+                    version = message["version"]
+
+                if not msg.metadata.num_pending:
+                    break
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            await subscription.unsubscribe()
+
+        return changes
+
+    async def purge(self, game_code: str) -> None:
+        """Drop everything retained for the game."""
+        await self.js.purge_stream(self.STREAM, subject=f"game.{game_code}")
+        await self.js.purge_stream(self.STREAM, subject=f"game.{game_code}.>")
@@ -1,41 +1,265 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from contextlib import contextmanager
 from contextvars import ContextVar
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, AsyncIterator, Callable, Iterator
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
+from starlette.requests import HTTPConnection
+from starlette.routing import BaseRoute, Mount, NoMatchFound
 from starlette.templating import Jinja2Templates as StarletteJinja2Templates
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import (
+    ChoiceLoader,
+    Environment,
+    FileSystemLoader,
+    ModuleLoader,
+    TemplateNotFound,
+    nodes,
+)
+from jinja2.async_utils import auto_await
+from jinja2.ext import Extension
+from markupsafe import Markup
 
 
 _current_request: ContextVar[Request] = ContextVar("current_request")
 """Global context variable to store the current request."""
 
+_render_context: ContextVar[RenderContext] = ContextVar("render_context")
+"""Variables added to every render of the current request or connection."""
+
 _templates: Jinja2Templates | None = None
 """Holds the loaded Templates instance."""
 
+_url_table: URLTable | None = None
+"""Holds the compiled route table for url_for()."""
+
+MANIFEST_NAME = "manifest.json"
+"""Source digests of the templates in a `compile_templates` bundle."""
+
+STREAM_CHUNK_SIZE = 4096
+"""Default size (in characters) of the chunks sent by `render_stream()`."""
+
+
+@dataclass
+class FragmentCacheStats:
+    """Counters exposed for monitoring."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+class FragmentCache:
+    """
+    Rendered `{% cache %}` fragments, least recently used evicted first (one per worker).
+
+    A `max_entries` of 0 turns caching off (e.g. while templates are edited).
+    """
+
+    def __init__(self, *, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self.stats = FragmentCacheStats()
+        self._entries: OrderedDict[tuple, Markup] = OrderedDict()
+
+    def get(self, key: tuple) -> Markup | None:
+        html = self._entries.get(key)
+        if html is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        self._entries.move_to_end(key)
+        return html
+
+    def put(self, key: tuple, html: Markup) -> None:
+        if not self.max_entries:
+            return
+
+        self._entries[key] = html
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class FragmentCacheExtension(Extension):
+    """
+    Adds `{% cache key, ... %}...{% endcache %}`: the body is rendered once per distinct key
+    and then served from the environment's `fragment_cache`.
+
+    The key must cover everything the body depends on - other variables are not looked at.
+    Keys are scoped to the template and line of the tag, so they only need to be unique there,
+    and to the request's base URL, which `url_for` builds on.
+
+    Examples:
+        {% cache p.id, p.name, p.avatar, is_host, is_current_player %}
+            ... player card ...
+        {% endcache %}
+    """
+
+    tags = {"cache"}
+
+    def __init__(self, environment: Environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=FragmentCache())
+
+    def parse(self, parser) -> nodes.Node:
+        lineno = next(parser.stream).lineno
+
+        key = []
+        while parser.stream.current.type != "block_end":
+            if key:
+                parser.stream.expect("comma")
+            key.append(parser.parse_expression())
+
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        call = self.call_method(
+            "_render_cached",
+            [nodes.Const((parser.name, lineno)), nodes.Tuple(key, "load")],
+        )
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    async def _render_cached(self, location: tuple, key: tuple, caller) -> Markup:
+        cache: FragmentCache = self.environment.fragment_cache
+
+        # Fragments may contain absolute URLs (`url_for`) - keep them per base URL
+        render_context = _render_context.get(None)
+        base_url = render_context.base_url if render_context is not None else None
+        cache_key = (location, base_url, key)
+
+        if (html := cache.get(cache_key)) is None:
+            html = await auto_await(caller())
+            cache.put(cache_key, html)
+
+        return html
+
+
+class RenderContext:
+    """
+    Variables added to every render of one request or connection: `request`, and what the
+    context processors return.
+
+    Built once per request (or WebSocket), and reused by all of its renders - a long-lived
+    SSE connection renders many times for the same request. The processors only run on the
+    first render, if there is one at all.
+    """
+
+    __slots__ = ("request", "_processors", "_variables", "_base_url")
+
+    def __init__(
+        self,
+        request: HTTPConnection,
+        processors: list[Callable[[HTTPConnection], dict[str, Any]]],
+    ):
+        self.request = request
+        self._processors = processors
+        self._variables: dict[str, Any] | None = None
+        self._base_url: str | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Base of the URLs built for this request - http(s), also for WebSockets (computed once)."""
+        if self._base_url is None:
+            base_url = self.request.base_url
+            if base_url.scheme in ("ws", "wss"):
+                # Links in rendered HTML are fetched over HTTP, not the socket's scheme
+                base_url = base_url.replace(
+                    scheme="https" if base_url.scheme == "wss" else "http"
+                )
+            self._base_url = str(base_url)
+        return self._base_url
+
+    @property
+    def variables(self) -> dict[str, Any]:
+        """What the context processors return for this request (computed once)."""
+        if self._variables is None:
+            variables = {}
+            for processor in self._processors:
+                variables.update(processor(self.request))
+            self._variables = variables
+        return self._variables
+
+    def merge(self, context: dict[str, Any] | None) -> dict[str, Any]:
+        """Variables for one render (a new dict - the caller's context is left as is)."""
+        # Like Starlette: a `request` passed in wins, context processors win over both
+        return {"request": self.request, **(context or {}), **self.variables}
+
+
+class CompiledTemplateLoader(ModuleLoader):
+    """
+    Loads templates precompiled by `compile_templates`, as long as their source is unchanged.
+
+    Templates edited after the bundle was built (e.g. in a bind-mounted checkout) are
+    reported as not found, so the next loader compiles them from source instead.
+    """
+
+    def __init__(self, path: Path | str, directory: Path | str):
+        super().__init__(path)
+        manifest = json.loads((Path(path) / MANIFEST_NAME).read_text())
+        self.fresh = {
+            name
+            for name, digest in manifest.items()
+            if _source_digest(Path(directory) / name) == digest
+        }
+
+    def load(self, environment, name, globals=None):
+        if name not in self.fresh:
+            raise TemplateNotFound(name)
+        return super().load(environment, name, globals)
+
 
 class Jinja2Templates(StarletteJinja2Templates):
     """
     Enhanced version of Starlette's Jinja2Templates with async rendering and block support while maintaining full compatibility.
     """
 
-    def __init__(self, directory=None, **kwargs):
+    def __init__(
+        self,
+        directory=None,
+        *,
+        compiled_directory=None,
+        fragment_cache_size: int = 1000,
+        **kwargs,
+    ):
         """
         Initialize templates with async support.
 
         Args:
             directory: Template directory path
+            compiled_directory: Directory of templates precompiled by `compile_templates` (used first for unchanged templates, if it exists)
+            fragment_cache_size: Fragments kept by `{% cache %}` (0 = don't cache)
             **kwargs: All Jinja2 Environment options (filters, globals, etc.)
         """
         # Enable async in kwargs if not specified
         if directory:
             # Create async-enabled environment
             loader = FileSystemLoader(directory)
+            if compiled_directory and Path(compiled_directory).is_dir():
+                # Templates missing from the bundle (or changed since) are still compiled on demand
+                loader = ChoiceLoader(
+                    [CompiledTemplateLoader(compiled_directory, directory), loader]
+                )
+
+            # Always loaded, so precompiled templates can use `{% cache %}`
+            extensions = [*kwargs.pop("extensions", ()), FragmentCacheExtension]
             env = Environment(
-                loader=loader, autoescape=True, enable_async=True, **kwargs
+                loader=loader,
+                autoescape=True,
+                enable_async=True,
+                extensions=extensions,
+                **kwargs,
             )
+            env.fragment_cache.max_entries = fragment_cache_size
+            self.directory = directory
             super().__init__(env=env)
         else:
             # Allow passing custom environment
@@ -43,6 +267,13 @@ class Jinja2Templates(StarletteJinja2Templates):
             kwargs.setdefault("enable_async", True)
             super().__init__(**kwargs)
 
+    def warm_up(self) -> int:
+        """Load (and compile, if not precompiled) every template now. Returns the number loaded."""
+        names = FileSystemLoader(self.directory).list_templates()
+        for name in names:
+            self.get_template(name)
+        return len(names)
+
     async def render(
         self, template_name: str, context: dict[str, Any] = None, block: str = None
     ) -> str:
@@ -57,6 +288,32 @@ class Jinja2Templates(StarletteJinja2Templates):
         Returns:
             Rendered HTML string
         """
+        chunks = [chunk async for chunk in self.stream(template_name, context, block)]
+        return self.env.concat(chunks)
+
+    def stream(
+        self,
+        template_name: str,
+        context: dict[str, Any] = None,
+        block: str = None,
+        *,
+        chunk_size: int = 0,
+    ) -> AsyncIterator[str]:
+        """
+        Render template or specific block piece by piece, as the template produces it.
+
+        The template, block and request context are resolved right away (so errors show up
+        before a response starts); rendering only happens while the result is iterated.
+
+        Args:
+            template_name: Template file path, optionally with #block syntax (e.g. "template.html#sidebar")
+            context: Template variables
+            block: Optional block name (fallback if not using #block syntax)
+            chunk_size: Join output into chunks of at least this many characters (0 = as produced)
+
+        Returns:
+            Async iterator of HTML chunks
+        """
         # Parse template#block syntax
         if "#" in template_name:
             template_path, block_name = template_name.split("#", 1)
@@ -64,18 +321,14 @@ class Jinja2Templates(StarletteJinja2Templates):
             template_path, block_name = template_name, block
 
         template = self.get_template(template_path)
-        final_context = context or {}
-
-        # Auto-inject current request if available
-        try:
-            request = _current_request.get()
-            final_context.setdefault("request", request)
-            # Apply context processors like Starlette does
-            for processor in self.context_processors:
-                final_context.update(processor(request))
-        except LookupError:
+
+        # Auto-inject current request (and context processors) if available
+        render_context = _render_context.get(None)
+        if render_context is not None:
+            final_context = render_context.merge(context)
+        else:
             # No request context - fine for background tasks, etc.
-            pass
+            final_context = dict(context or {})
 
         if block_name:
             # Render specific block
@@ -88,14 +341,96 @@ class Jinja2Templates(StarletteJinja2Templates):
 
             # Create context and render block
             ctx = template.new_context(final_context)
-            block_func = template.blocks[block_name]
+            chunks = template.blocks[block_name](ctx)
+        else:
+            # Render full template
+            chunks = template.generate_async(final_context)
+
+        if chunk_size:
+            return self._buffered(chunks, chunk_size)
+        return chunks
+
+    async def _buffered(
+        self, chunks: AsyncIterator[str], chunk_size: int
+    ) -> AsyncIterator[str]:
+        # Templates emit many tiny strings - send them in fewer, larger pieces
+        buffer, size = [], 0
+        async for chunk in chunks:
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= chunk_size:
+                yield self.env.concat(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield self.env.concat(buffer)
+
+
+class URLTable:
+    """
+    Reverse lookup of route URLs by name, compiled once from the app's routes.
+
+    `request.url_for` tries every route of the router in turn on each call. Here routes are
+    looked up by name, and built URLs are memoized (least recently used evicted first), so
+    the same static file or page link is only built once.
+
+    URLs are absolute when a base URL is given (the request's, or `base_url` outside of
+    requests), and just paths otherwise.
+    """
+
+    def __init__(
+        self,
+        routes: list[BaseRoute],
+        *,
+        base_url: str | None = None,
+        max_entries: int = 4096,
+    ):
+        self.base_url = base_url
+        self.max_entries = max_entries
+        self._routes: dict[str, list[BaseRoute]] = {}
+        self._urls: OrderedDict[tuple, str] = OrderedDict()
+
+        # Same order as the router, which uses the first route that matches
+        for route in routes:
+            for name in _route_names(route):
+                self._routes.setdefault(name, []).append(route)
+
+    def url_for(
+        self, name: str, path_params: dict[str, Any], base_url: str | None = None
+    ) -> str:
+        base_url = base_url or self.base_url
+        key = (base_url, name, tuple(sorted(path_params.items())))
+
+        if (url := self._urls.get(key)) is not None:
+            self._urls.move_to_end(key)
+            return url
+
+        path = self._url_path_for(name, path_params)
+        url = str(path.make_absolute_url(base_url) if base_url else path)
 
-            # Collect chunks from block generator
-            chunks = [chunk async for chunk in block_func(ctx)]
-            return self.env.concat(chunks)
+        self._urls[key] = url
+        while len(self._urls) > self.max_entries:
+            self._urls.popitem(last=False)
+        return url
 
-        # Render full template
-        return await template.render_async(final_context)
+    def _url_path_for(self, name: str, path_params: dict[str, Any]):
+        for route in self._routes.get(name, ()):
+            try:
+                return route.url_path_for(name, **path_params)
+            except NoMatchFound:
+                pass
+        raise NoMatchFound(name, path_params)
+
+
+def _route_names(route: BaseRoute) -> Iterator[str]:
+    """Names `route` builds URLs for (including those of mounted routes, as "mount:name")."""
+    if isinstance(route, Mount):
+        if route.name:
+            yield route.name
+        for child in route.routes:
+            for name in _route_names(child):
+                yield f"{route.name}:{name}" if route.name else name
+    elif name := getattr(route, "name", None):
+        yield name
 
 
 class FastHTML(FastAPI):
@@ -109,12 +444,23 @@ class FastHTML(FastAPI):
         super().__init__(*args, **kwargs)
         self.templates: Jinja2Templates | None = None
 
-    def add_templates(self, directory: Path | str, **jinja2_options) -> Jinja2Templates:
+    def add_templates(
+        self,
+        directory: Path | str,
+        *,
+        compiled_directory: Path | str | None = None,
+        warm_up: bool = False,
+        fragment_cache_size: int = 1000,
+        **jinja2_options,
+    ) -> Jinja2Templates:
         """
         Load templates with full customization support.
 
         Args:
             directory: Template directory path
+            compiled_directory: Directory of templates precompiled by `compile_templates`
+            warm_up: Load all templates now, instead of on their first render
+            fragment_cache_size: Fragments kept by `{% cache %}` (0 = don't cache)
             **jinja2_options: Any Jinja2 Environment options
 
         Returns:
@@ -136,26 +482,116 @@ class FastHTML(FastAPI):
                 lstrip_blocks=True,
                 cache_size=1000
             )
+
+            # Production: precompiled, loaded at startup, never re-checked
+            app.load_templates("templates",
+                compiled_directory="/opt/templates",
+                warm_up=True,
+                auto_reload=False,
+            )
         """
         # Create templates instance
-        self.templates = Jinja2Templates(directory, **jinja2_options)
+        self.templates = Jinja2Templates(
+            directory,
+            compiled_directory=compiled_directory,
+            fragment_cache_size=fragment_cache_size,
+            **jinja2_options,
+        )
+        if warm_up:
+            self.templates.warm_up()
 
         # Store globally for render() function
         global _templates
         _templates = self.templates
 
+        # Templates build URLs like the app does (no `request` needed in the context)
+        self.templates.env.globals["url_for"] = url_for
+
         # Add middleware for request context injection
         @self.middleware("http")
         async def inject_request_context(request: Request, call_next):
-            token = _current_request.set(request)
-            try:
+            with request_context(request):
                 response = await call_next(request)
                 return response
-            finally:
-                _current_request.reset(token)
 
         return self.templates
 
+    def compile_url_table(
+        self, *, base_url: str | None = None, max_entries: int = 4096
+    ) -> URLTable:
+        """
+        Compile the route table used by `url_for()` (once all routes are added).
+
+        Args:
+            base_url: Public URL of the app, for absolute URLs built outside of requests
+            max_entries: URLs memoized at most
+
+        Returns:
+            URLTable instance
+
+        Examples:
+            app.include_router(router)
+            app.compile_url_table(base_url="https://example.com")
+        """
+        global _url_table
+        _url_table = URLTable(
+            self.router.routes, base_url=base_url, max_entries=max_entries
+        )
+        return _url_table
+
+
+@contextmanager
+def request_context(request: HTTPConnection) -> Iterator[RenderContext]:
+    """
+    Make `request` the current request for `render()` and `url_for()`.
+
+    Done for every HTTP request by `add_templates`. WebSocket endpoints (which skip HTTP
+    middleware) can use it for renders pushed over the socket.
+
+    Examples:
+        with request_context(websocket):
+            await websocket.send_text(await render("game.html#game_state", context))
+    """
+    processors = _templates.context_processors if _templates is not None else []
+    render_context = RenderContext(request, processors)
+
+    request_token = _current_request.set(request)
+    render_token = _render_context.set(render_context)
+    try:
+        yield render_context
+    finally:
+        _render_context.reset(render_token)
+        _current_request.reset(request_token)
+
+
+def compile_templates(
+    directory: Path | str, target: Path | str, **jinja2_options
+) -> None:
+    """
+    Precompile all templates into Python modules (e.g. at build time), for `compiled_directory`.
+
+    Options affecting compilation (e.g. extensions, trim_blocks) must match the app's.
+
+    Examples:
+        compile_templates("app/templates", "/opt/templates")
+    """
+    templates = Jinja2Templates(directory, **jinja2_options)
+    templates.env.compile_templates(target, zip=None, ignore_errors=False)
+
+    # Lets the app tell which compiled templates are still current
+    manifest = {
+        name: _source_digest(Path(directory) / name)
+        for name in templates.env.list_templates()
+    }
+    (Path(target) / MANIFEST_NAME).write_text(json.dumps(manifest))
+
+
+def _source_digest(path: Path) -> str | None:
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
 
 async def render(
     template_name: str, context: dict[str, Any] = None, block: str = None
@@ -183,27 +619,181 @@ async def render(
     return await _templates.render(template_name, context, block)
 
 
+def stream(
+    template_name: str,
+    context: dict[str, Any] = None,
+    block: str = None,
+    *,
+    chunk_size: int = 0,
+) -> AsyncIterator[str]:
+    """
+    Render templates piece by piece from anywhere in your application, with automatic request context.
+
+    Args:
+        template_name: Template file path, optionally with #block syntax (e.g. "template.html#sidebar")
+        context: Variables to pass to template
+        block: Optional block name (fallback if not using #block syntax)
+        chunk_size: Join output into chunks of at least this many characters (0 = as produced)
+
+    Returns:
+        Async iterator of HTML chunks
+
+    Examples:
+        async for chunk in stream("layout.html#sidebar", {"items": items}):
+            ...
+    """
+    if _templates is None:
+        raise RuntimeError("Templates not loaded. Call app.load_templates() first.")
+
+    return _templates.stream(template_name, context, block, chunk_size=chunk_size)
+
+
+def render_stream(
+    template_name: str,
+    context: dict[str, Any] = None,
+    block: str = None,
+    *,
+    status_code: int = 200,
+    headers: dict[str, str] | None = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> StreamingResponse:
+    """
+    Respond with a template that is sent while it renders, instead of after.
+
+    The browser gets the start of the page (e.g. <head> with its stylesheets) right away,
+    and at most about `chunk_size` characters of the page are held in memory at a time.
+
+    Args:
+        template_name: Template file path, optionally with #block syntax (e.g. "template.html#sidebar")
+        context: Variables to pass to template
+        block: Optional block name (fallback if not using #block syntax)
+        status_code: Response status code
+        headers: Extra response headers
+        chunk_size: Join output into chunks of at least this many characters
+
+    Returns:
+        Streaming HTML response
+
+    Examples:
+        return render_stream("index.html", {"games": games})
+    """
+    return StreamingResponse(
+        stream(template_name, context, block, chunk_size=chunk_size),
+        status_code=status_code,
+        headers=headers,
+        media_type="text/html",
+    )
+
+
+class SharedRender:
+    """
+    Render a template once for all viewers, then splice in the few fragments that depend on the viewer.
+
+    The shared HTML is rendered once, with the viewer variable set to None. For each viewer,
+    `viewer_fragments(viewer)` names the blocks that look different to them (e.g. their own
+    player card). Only those are rendered per viewer and swapped into the shared HTML.
+
+    Args:
+        template_name: Template file path, optionally with #block syntax
+        context: Variables shared by all viewers
+        viewer_fragments: Returns {key: (template#block, extra context)} for a viewer
+        viewer_name: Template variable holding the viewer
+
+    Examples:
+        view = SharedRender(
+            "game.html#game_state",
+            {"game": game},
+            viewer_fragments=lambda player: {
+                f"player-{player.id}": ("partials/_lobby.html#player_card", {"p": player}),
+            },
+        )
+        html = await view.render_for(player)
+    """
+
+    def __init__(
+        self,
+        template_name: str,
+        context: dict[str, Any],
+        *,
+        viewer_fragments: Callable[[Any], dict[str, tuple[str, dict[str, Any]]]],
+        viewer_name: str = "player",
+    ):
+        self.template_name = template_name
+        self.context = context
+        self.viewer_fragments = viewer_fragments
+        self.viewer_name = viewer_name
+
+        self._shared: dict[str, str] = {}
+        """Shared (viewer-less) renders, keyed by fragment key."""
+
+        self._lock = asyncio.Lock()
+
+    async def render_for(self, viewer: Any) -> str:
+        """Render the template as seen by the given viewer."""
+        html = await self.render_shared(None, self.template_name, {})
+
+        for key, (template_name, extra) in self.viewer_fragments(viewer).items():
+            shared_fragment = await self.render_shared(key, template_name, extra)
+            viewer_fragment = await self.render_viewer(template_name, extra, viewer)
+            if viewer_fragment != shared_fragment:
+                html = html.replace(shared_fragment, viewer_fragment, 1)
+
+        return html
+
+    async def render_viewer(
+        self, template_name: str, extra: dict[str, Any], viewer: Any
+    ) -> str:
+        """Render a fragment as seen by the given viewer."""
+        return await render(
+            template_name, {**self.context, **extra, self.viewer_name: viewer}
+        )
+
+    async def render_shared(
+        self, key: str | None, template_name: str, extra: dict[str, Any]
+    ) -> str:
+        """Render (once) a template or fragment without a viewer."""
+        if (html := self._shared.get(key)) is not None:
+            return html
+
+        async with self._lock:
+            if key not in self._shared:
+                self._shared[key] = await render(
+                    template_name,
+                    {**self.context, **extra, self.viewer_name: None},
+                )
+
+        return self._shared[key]
+
+
 def url_for(name: str, **path_params: Any) -> str:
     """
     Generate URLs from anywhere in your application with automatic request context.
 
+    Uses the table compiled by `app.compile_url_table()`, so it also works outside of
+    requests (e.g. in background broadcasts), relative to the table's `base_url`.
+
     Args:
         name: Route name (function name)
         **path_params: Path parameters for the route
 
     Returns:
-        URL string
+        URL string (absolute, unless there is neither a request nor a `base_url`)
 
     Examples:
         url_for("get_game", game_code=game.code)
         url_for("user_profile", user_id=123)
     """
-    try:
-        request = _current_request.get()
-    except LookupError:
+    render_context = _render_context.get(None)
+    base_url = render_context.base_url if render_context is not None else None
+
+    if _url_table is not None:
+        return _url_table.url_for(name, path_params, base_url)
+
+    if render_context is None:
         raise RuntimeError(
             "No request context available. url_for() can only be called "
-            "during request handling."
+            "during request handling, or after app.compile_url_table()."
         )
 
-    return str(request.url_for(name, **path_params))
+    path = render_context.request.app.url_path_for(name, **path_params)
+    return str(path.make_absolute_url(base_url))
@@ -0,0 +1,137 @@
+"""
+Presence tracking: connections stay active for as long as their live stream is open.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator
+
+from tortoise import connections, timezone
+
+from app.models import PlayerGameConnection
+
+logger = logging.getLogger(__name__)
+
+
+class HeartbeatBuffer:
+    """
+    Tracks presence of connections with an open live stream (SSE) on this worker.
+
+    While a stream is open, the server records a heartbeat for it every `heartbeat_interval`
+    seconds. Heartbeats are collected in memory and written in one bulk UPDATE per
+    `flush_interval`. Only `is_active` transitions (stream opened / last stream closed) are
+    written immediately, since those change what other players see.
+    """
+
+    def __init__(self, *, flush_interval: float, heartbeat_interval: float):
+        self.flush_interval = flush_interval
+        self.heartbeat_interval = heartbeat_interval
+
+        self._pending: dict[int, datetime] = {}
+        """Latest heartbeat of each connection, not yet written."""
+
+        self._tracked: dict[int, PlayerGameConnection] = {}
+        """Connections with at least one open stream on this worker."""
+
+        self._open_streams: dict[int, int] = {}
+        """Number of open streams per connection (e.g. several tabs)."""
+
+    @asynccontextmanager
+    async def track(self, connection: PlayerGameConnection) -> AsyncIterator[None]:
+        """Keep the connection active while the block runs, and mark it inactive when the last stream closes."""
+        self._tracked[connection.id] = connection
+        self._open_streams[connection.id] = self._open_streams.get(connection.id, 0) + 1
+
+        keep_alive = None
+        try:
+            await self.record(connection)
+            keep_alive = asyncio.create_task(self._keep_alive(connection))
+            yield
+        finally:
+            if keep_alive is not None:
+                keep_alive.cancel()
+            self._open_streams[connection.id] -= 1
+
+            if not self._open_streams[connection.id]:
+                del self._open_streams[connection.id]
+                del self._tracked[connection.id]
+                # Stream was cancelled - finish the write regardless
+                await asyncio.shield(self._deactivate(connection))
+
+    async def record(self, connection: PlayerGameConnection) -> bool:
+        """Record a heartbeat. Returns True if the connection was reactivated."""
+        now = timezone.now()
+        connection.last_heartbeat = now
+
+        if connection.is_active:
+            self._pending[connection.id] = now
+            return False
+
+        # Reactivation - write right away
+        self._pending.pop(connection.id, None)
+        connection.is_active = True
+        connection.activity_changed_at = now
+        await connection.save(
+            update_fields=[
+                "is_active",
+                "activity_changed_at",
+                "last_heartbeat",
+                "updated_at",
+            ]
+        )
+        return True
+
+    async def flush(self) -> None:
+        """Write all pending heartbeats in a single statement."""
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+
+        rows = await connections.get("default").execute_query_dict(
+            f"""
+            UPDATE {PlayerGameConnection._meta.db_table} AS c
+            SET last_heartbeat = GREATEST(c.last_heartbeat, v.last_heartbeat)
+            FROM unnest($1::int[], $2::timestamptz[]) AS v(id, last_heartbeat)
+            WHERE c.id = v.id
+            RETURNING c.id, c.is_active
+            """,
+            [list(pending.keys()), list(pending.values())],
+        )
+
+        # Deactivated elsewhere (e.g. another tab closed on another worker) while still open here
+        for row in rows:
+            if not row["is_active"] and (connection := self._tracked.get(row["id"])):
+                connection.is_active = False
+                # As stored - so reactivating it is a change (event, activity_changed_at)
+                connection._take_snapshot()
+                await self.record(connection)
+
+    async def run(self) -> None:
+        """Flush pending heartbeats every `flush_interval` seconds (until cancelled)."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing heartbeats failed")
+
+    async def _keep_alive(self, connection: PlayerGameConnection) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.record(connection)
+            except Exception:
+                logger.exception(
+                    "Recording heartbeat for connection %s failed", connection.id
+                )
+
+    async def _deactivate(self, connection: PlayerGameConnection) -> None:
+        self._pending.pop(connection.id, None)
+        connection.is_active = False
+        connection.activity_changed_at = timezone.now()
+        await connection.save(
+            update_fields=["is_active", "activity_changed_at", "updated_at"]
+        )
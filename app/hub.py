@@ -0,0 +1,423 @@
+"""
+In-process fan-out of game changes to the clients connected to this worker.
+"""
+
+import asyncio
+import copy
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from nats.aio.client import Client as NATS
+from nats.aio.msg import Msg
+from nats.aio.subscription import Subscription
+
+from app.cache import GameCache
+from app.event_log import GameEventLog
+from app.fasthtml import SharedRender
+from app.models import Game, Player, PlayerGameConnection
+
+
+class GameUpdate:
+    """
+    A game change, shared by all local clients of the game.
+
+    The `game_state` block is rendered once per change; each client only re-renders
+    the fragments that look different to them.
+    """
+
+    def __init__(self, game: Game):
+        self.game = game
+        self.version = game.version
+        self.view = SharedRender(
+            "game.html#game_state",
+            {"game": game},
+            viewer_fragments=self._viewer_fragments,
+        )
+
+    async def render_for(self, player: Player) -> str:
+        """Render the `game_state` block as seen by the player."""
+        return await self.view.render_for(player)
+
+    async def fragments_for(self, player: Player) -> dict[str, str] | None:
+        """Render the patchable fragments (element id -> HTML) as seen by the player, or None outside the lobby."""
+        if not self.game.is_in_lobby:
+            return None
+
+        viewer_fragments = self._viewer_fragments(player)
+
+        fragments = {}
+        for element_id, (template_name, extra) in self._fragments().items():
+            if element_id in viewer_fragments:
+                html = await self.view.render_viewer(template_name, extra, player)
+            else:
+                html = await self.view.render_shared(element_id, template_name, extra)
+            fragments[element_id] = html
+
+        return fragments
+
+    def _fragments(self) -> dict[str, tuple[str, dict]]:
+        """Lobby fragments that can be swapped on their own, keyed by element id."""
+        code = self.game.code
+
+        fragments = {
+            "notifications": ("partials/_notifications.html", {}),
+            f"player-count-{code}": ("partials/_lobby.html#player_count", {}),
+        }
+        for p in self.game.connected_players:
+            fragments[f"player-{code}-{p.id}"] = (
+                "partials/_lobby.html#player_card",
+                {"p": p},
+            )
+        fragments[f"lobby-actions-{code}"] = ("partials/_lobby.html#lobby_actions", {})
+
+        return fragments
+
+    def _viewer_fragments(self, player: Player) -> dict[str, tuple[str, dict]]:
+        """Fragments that look different to the player than in the shared render, keyed by element id."""
+        if not self.game.is_in_lobby:
+            return {}
+
+        code = self.game.code
+        fragments = {}
+
+        # Own player card has the "You" badge - rendered from the same `p` as the shared one,
+        # so it replaces it exactly
+        p = next((p for p in self.game.connected_players if p.id == player.id), None)
+        if p is not None:
+            fragments[f"player-{code}-{p.id}"] = (
+                "partials/_lobby.html#player_card",
+                {"p": p},
+            )
+
+        # Host gets the start button
+        if player == self.game.host:
+            fragments[f"lobby-actions-{code}"] = (
+                "partials/_lobby.html#lobby_actions",
+                {},
+            )
+
+        return fragments
+
+
+class LobbyPatcher:
+    """
+    Turns successive lobby renders for one client into htmx out-of-band swaps.
+
+    Only fragments that changed since the last render are sent: new player cards are
+    appended to the grid, changed fragments replaced by id, and gone ones deleted.
+    The payload size stays constant as lobbies grow.
+    """
+
+    def __init__(self, game_code: str):
+        self.game_code = game_code
+
+        self.sent: dict[str, str] | None = None
+        """Fragments the client currently shows."""
+
+    def patch(self, fragments: dict[str, str] | None) -> str | None:
+        """Return the (possibly empty) patch to the new fragments, or None if the client needs a full refresh."""
+        previous, self.sent = self.sent, fragments
+
+        if previous is None or fragments is None:
+            return None
+
+        patches = []
+        for element_id, html in fragments.items():
+            if element_id not in previous:
+                # Wrapper is stripped by htmx for non-inline swaps
+                patches.append(
+                    f'<div hx-swap-oob="beforeend:#players-{self.game_code}">{html}</div>'
+                )
+            elif html != previous[element_id]:
+                patches.append(
+                    html.replace(
+                        f'id="{element_id}"',
+                        f'id="{element_id}" hx-swap-oob="true"',
+                        1,
+                    )
+                )
+
+        for element_id in previous.keys() - fragments.keys():
+            patches.append(f'<div id="{element_id}" hx-swap-oob="delete"></div>')
+
+        return "".join(patches)
+
+
+class GameChannel:
+    """
+    Local clients of a single game, sharing one NATS subscription.
+    """
+
+    def __init__(self, game_code: str, cache: GameCache):
+        self.game_code = game_code
+        self.cache = cache
+        """Holds the latest known state of the game, which changes are applied to."""
+
+        self.subscription: Subscription | None = None
+        self.queues: set[asyncio.Queue[GameUpdate]] = set()
+        self.version = 0
+        """Latest game version handed to clients."""
+
+    async def on_message(self, msg: Msg) -> None:
+        """Apply the changes (or load the game if needed) once and hand it to every local client."""
+        message = json.loads(msg.data)
+
+        # Drop stale or duplicate notifications
+        if message["version"] <= self.version:
+            return
+
+        game = None
+        if (cached := self.cache.peek(self.game_code)) is not None:
+            game = apply_changes(cached, message["changes"])
+
+        if game is None:
+            game = await Game.get_by_code(self.game_code)
+            if game is None or game.version <= self.version:
+                return
+
+        self.cache.put(game)
+        self.version = game.version
+
+        update = GameUpdate(game)
+        for queue in self.queues:
+            put_latest(queue, update)
+
+
+class GameHub:
+    """
+    Shares one `game.{code}` NATS subscription per active game between all clients of this worker.
+
+    Each change is loaded from the database once and handed to every local client queue.
+    The subscription is dropped as soon as the last client of a game leaves.
+
+    The latest state of subscribed games is kept current in the `cache`, so requests for
+    them don't need to load the game either.
+
+    With an `event_log`, a new subscription starts from the latest version in the log, so
+    clients that loaded the game just before a change only catch up when they missed one -
+    by replaying the missed changes from the log, or reloading the game if it lacks them.
+
+    Example:
+        async with hub.listen(game.code) as updates:
+            while True:
+                update = await updates.get()
+                html = await update.render_for(player)
+    """
+
+    def __init__(
+        self,
+        nats_connection: NATS,
+        *,
+        refresh_mode: str = "full",
+        event_log: GameEventLog | None = None,
+        cache: GameCache | None = None,
+    ):
+        self.nats_connection = nats_connection
+        self.refresh_mode = refresh_mode
+        self.event_log = event_log
+        self.cache = cache or GameCache()
+        self.channels: dict[str, GameChannel] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._lock_users: dict[str, int] = {}
+
+    @asynccontextmanager
+    async def listen(self, game_code: str) -> AsyncIterator[asyncio.Queue[GameUpdate]]:
+        """Register a client for a game and yield the queue its updates arrive on."""
+        queue: asyncio.Queue[GameUpdate] = asyncio.Queue(maxsize=1)
+
+        await self._join(game_code, queue)
+        try:
+            yield queue
+        finally:
+            # Client may have been cancelled (disconnected) - finish leaving regardless
+            await asyncio.shield(self._leave(game_code, queue))
+
+    async def stream(
+        self, game: Game, player: Player, *, since_version: int = 0
+    ) -> AsyncIterator[tuple[int, str, str]]:
+        """
+        Yield (version, event, HTML) for the player on every change newer than `since_version`.
+
+        Event is "refreshGame" (whole `game_state` block) or, in delta mode, "patchGame"
+        (out-of-band swaps of the changed fragments only).
+        Starts with the already loaded `game` if the client missed changes while disconnected.
+        """
+        last_version = since_version
+        patcher = LobbyPatcher(game.code) if self.refresh_mode == "delta" else None
+
+        async with self.listen(game.code) as updates:
+            # Changed between loading the game and subscribing
+            if self.channels[game.code].version > game.version:
+                game = await self._catch_up(game, self.channels[game.code].version)
+            self.cache.put(game)
+
+            # Catch up on changes missed while disconnected
+            if game.version > last_version:
+                update = GameUpdate(game)
+            else:
+                update = await updates.get()
+
+            while True:
+                # Skip stale or duplicate refreshes
+                if update.version > last_version:
+                    patch = None
+                    if patcher is not None:
+                        patch = patcher.patch(await update.fragments_for(player))
+
+                    if patch is None:
+                        html = await update.render_for(player)
+                        yield update.version, "refreshGame", html
+                    elif patch:
+                        yield update.version, "patchGame", patch
+
+                    last_version = update.version
+
+                update = await updates.get()
+
+    async def _catch_up(self, game: Game, version: int) -> Game:
+        """Bring the game up to `version`, from the event log's tail if it has the missed changes."""
+        if self.event_log is not None:
+            changes = await self.event_log.replay_changes(
+                game.code, since_version=game.version
+            )
+            if changes and (replayed := apply_changes(game, changes)) is not None:
+                if replayed.version >= version:
+                    return replayed
+
+        return await Game.get_by_code(game.code) or game
+
+    @asynccontextmanager
+    async def _locked(self, game_code: str) -> AsyncIterator[None]:
+        """Serialize joining and leaving one game - other games aren't held up meanwhile."""
+        lock = self._locks.setdefault(game_code, asyncio.Lock())
+        self._lock_users[game_code] = self._lock_users.get(game_code, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[game_code] -= 1
+            if not self._lock_users[game_code]:
+                del self._locks[game_code], self._lock_users[game_code]
+
+    async def _join(self, game_code: str, queue: asyncio.Queue[GameUpdate]) -> None:
+        async with self._locked(game_code):
+            channel = self.channels.get(game_code)
+
+            if channel is None:
+                channel = GameChannel(game_code, self.cache)
+                self.cache.watch(game_code)
+                if self.event_log is not None:
+                    channel.version = await self.event_log.last_version(game_code)
+                channel.subscription = await self.nats_connection.subscribe(
+                    f"game.{game_code}", cb=channel.on_message
+                )
+                self.channels[game_code] = channel
+
+            channel.queues.add(queue)
+
+    async def _leave(self, game_code: str, queue: asyncio.Queue[GameUpdate]) -> None:
+        async with self._locked(game_code):
+            channel = self.channels.get(game_code)
+            if channel is None:
+                return
+
+            channel.queues.discard(queue)
+
+            # Last client left - tear down the subscription
+            if not channel.queues:
+                del self.channels[game_code]
+                self.cache.unwatch(game_code)
+                if channel.subscription is not None:
+                    await channel.subscription.unsubscribe()
+
+
+def apply_changes(game: Game, changes: list[dict] | None) -> Game | None:
+    """
+    Apply `game_change` changes to a copy of the game (with prefetched connections).
+
+    Returns None if they can't be applied in memory, e.g. when a change was missed or
+    the host moved to a player without a connection - the game has to be reloaded then.
+    """
+    if not changes or changes[0]["version"] != game.version + 1:
+        return None
+
+    # Clients may still be rendering the previous state - never change it in place
+    game = copy.copy(game)
+    connections = copy.copy(game.connections)
+    connections.related_objects = list(connections.related_objects)
+    game._connections = connections  # Backs the `connections` reverse relation
+
+    for change in changes:
+        if change["version"] != game.version + 1:
+            return None
+
+        if change["table"] == "connection":
+            if not _apply_connection_change(game, connections.related_objects, change):
+                return None
+
+        elif change["table"] == "game":
+            if change["host_id"] != game.host_id:
+                host = next(
+                    (
+                        c.player
+                        for c in game.connections
+                        if c.player.id == change["host_id"]
+                    ),
+                    None,
+                )
+                if host is None:
+                    return None
+                game.host = host
+            game.status = Game.Status(change["status"])
+
+        game.version = change["version"]
+
+    return game
+
+
+def _apply_connection_change(
+    game: Game, connections: list[PlayerGameConnection], change: dict
+) -> bool:
+    index = next(
+        (i for i, c in enumerate(connections) if c.id == change["id"]),
+        None,
+    )
+
+    if change["op"] == "INSERT":
+        if index is not None or change["player"] is None:
+            return False
+
+        player = Player(id=change["player_id"], **change["player"])
+        connection = PlayerGameConnection(
+            id=change["id"],
+            game_id=game.id,
+            player_id=player.id,
+            is_active=change["is_active"],
+        )
+        connection.player = player
+        # As if loaded - later saves UPDATE the rows, and lifecycle hooks compare against this state
+        player._saved_in_db = connection._saved_in_db = True
+        connection._take_snapshot()
+        connections.append(connection)
+        return True
+
+    if index is None:
+        return False
+
+    if change["op"] == "DELETE":
+        del connections[index]
+    else:
+        connection = copy.copy(connections[index])
+        connection.is_active = change["is_active"]
+        connection._take_snapshot()  # The copy shared the original's
+        connections[index] = connection
+
+    return True
+
+
+def put_latest(queue: asyncio.Queue, item) -> None:
+    """Put item on a bounded queue, replacing the oldest item if it's full (clients only need the latest state)."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
@@ -0,0 +1,70 @@
+"""
+Leader election across workers via Postgres advisory locks.
+"""
+
+import asyncio
+import logging
+
+import asyncpg
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElection:
+    """
+    Elects a single process (across all workers) to run a singleton job.
+
+    The session-level advisory lock is held on a dedicated connection. If the leader dies
+    (or loses its connection), Postgres releases the lock and another worker takes over
+    on its next attempt.
+
+    Example:
+        election = LeaderElection(lock_key=1)
+        asyncio.create_task(election.run())
+        ...
+        if election.is_leader:
+            ...
+    """
+
+    def __init__(self, lock_key: int, *, retry_interval: float = 5.0):
+        self.lock_key = lock_key
+        self.retry_interval = retry_interval
+        self.is_leader = False
+
+        self._connection: asyncpg.Connection | None = None
+
+    async def run(self) -> None:
+        """Try to acquire (or check we still hold) the lock every `retry_interval` seconds."""
+        while True:
+            try:
+                await self._check()
+            except (OSError, asyncpg.PostgresError):
+                logger.exception("Leader election failed (lock %s)", self.lock_key)
+                await self._disconnect()
+
+            await asyncio.sleep(self.retry_interval)
+
+    async def close(self) -> None:
+        """Give up leadership (closing the session releases the lock)."""
+        await self._disconnect()
+
+    async def _check(self) -> None:
+        if self._connection is None or self._connection.is_closed():
+            self.is_leader = False
+            self._connection = await asyncpg.connect(settings.DATABASE_URL)
+
+        if self.is_leader:
+            # Lock lives as long as the session - just make sure it's still alive
+            await self._connection.execute("SELECT 1")
+        else:
+            self.is_leader = await self._connection.fetchval(
+                "SELECT pg_try_advisory_lock($1)", self.lock_key
+            )
+
+    async def _disconnect(self) -> None:
+        self.is_leader = False
+        if self._connection is not None:
+            self._connection.terminate()
+            self._connection = None
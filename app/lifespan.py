@@ -1,35 +1,125 @@
+import asyncio
+import json
 from contextlib import asynccontextmanager
 
 import nats
-import asyncpg
 from fastapi import FastAPI
 from tortoise.contrib.fastapi import RegisterTortoise
 
+from app.bridge import BRIDGE_LOCK_KEY, GameChangeBridge
+from app.cache import PLAYER_CHANGED_SUBJECT, GameCache, PlayerCache
 from app.config import settings
+from app.event_log import GameEventLog
+from app.heartbeats import HeartbeatBuffer
+from app.hub import GameHub
+from app.leader import LeaderElection
+from app.outbox import event_outbox
+from app.sweeper import SWEEPER_LOCK_KEY, StaleConnectionSweeper
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    pg_connection: asyncpg.Connection = await asyncpg.connect(settings.DATABASE_URL)
     nats_connection: nats.NATS = await nats.connect(settings.NATS_URL)
 
+    # Recent changes & events of every game, replayable from memory
+    event_log = None
+    if settings.GAME_EVENT_LOG_ENABLED:
+        event_log = GameEventLog(
+            nats_connection,
+            max_per_game=settings.GAME_EVENT_LOG_MAX_PER_GAME,
+            max_age=settings.GAME_EVENT_LOG_MAX_AGE,
+        )
+        await event_log.setup()
+
+    # Games followed by the hub are read from memory
+    game_cache = GameCache(max_entries=settings.GAME_CACHE_MAX_ENTRIES)
+
+    # Players identified by session, dropped when changed on any worker
+    player_cache = PlayerCache(
+        ttl=settings.PLAYER_CACHE_TTL, max_entries=settings.PLAYER_CACHE_MAX_ENTRIES
+    )
+
+    async def on_player_changed(msg):
+        message = json.loads(msg.data)
+        player_cache.invalidate(message["session_id"])
+        game_cache.invalidate_player(message["player_id"])
+
+    await nats_connection.subscribe(PLAYER_CHANGED_SUBJECT, cb=on_player_changed)
+
     # Store in app state
-    app.state.pg_connection = pg_connection
     app.state.nats_connection = nats_connection
+    app.state.event_log = event_log
+    app.state.game_cache = game_cache
+    app.state.player_cache = player_cache
+    app.state.game_hub = GameHub(
+        nats_connection,
+        refresh_mode=settings.GAME_REFRESH_MODE,
+        event_log=event_log,
+        cache=game_cache,
+    )
+
+    # Forward notifications from Postgres -> NATS (on one elected worker, unless disabled)
+    bridge_election = (
+        LeaderElection(
+            BRIDGE_LOCK_KEY, retry_interval=settings.LEADER_ELECTION_INTERVAL
+        )
+        if settings.GAME_CHANGE_BRIDGE_MODE == "elected"
+        else None
+    )
+    bridge = GameChangeBridge(
+        nats_connection,
+        coalesce_window=settings.GAME_CHANGE_COALESCE_WINDOW,
+        election=bridge_election,
+        event_log=event_log,
+        probe_interval=settings.BRIDGE_PROBE_INTERVAL,
+        probe_timeout=settings.BRIDGE_PROBE_TIMEOUT,
+        max_backoff=settings.BRIDGE_MAX_RECONNECT_BACKOFF,
+    )
+    app.state.bridge = bridge
 
-    # Forward notifications from Postgres -> NATS
-    async def on_game_change(conn, pid, channel, game_code):
-        await nats_connection.publish(f"game.{game_code}")
+    # Track presence of open live streams (heartbeats written in batches)
+    heartbeats = HeartbeatBuffer(
+        flush_interval=settings.HEARTBEAT_FLUSH_INTERVAL,
+        heartbeat_interval=settings.PRESENCE_HEARTBEAT_INTERVAL,
+    )
+    app.state.heartbeats = heartbeats
 
-    await pg_connection.add_listener("game_change", on_game_change)
+    # Mark stale connections as inactive (on one elected worker)
+    sweeper_election = LeaderElection(
+        SWEEPER_LOCK_KEY, retry_interval=settings.LEADER_ELECTION_INTERVAL
+    )
+    sweeper = StaleConnectionSweeper(
+        sweeper_election,
+        interval=settings.CONNECTION_SWEEP_INTERVAL,
+        stale_after=settings.CONNECTION_STALE_AFTER,
+    )
 
     # Register ORM
     async with RegisterTortoise(
         app, config=settings.TORTOISE_ORM, generate_schemas=True
     ):
+        background_tasks = [
+            asyncio.create_task(bridge.run()),
+            asyncio.create_task(heartbeats.run()),
+            asyncio.create_task(event_outbox.run()),
+            asyncio.create_task(sweeper_election.run()),
+            asyncio.create_task(sweeper.run()),
+        ]
+        if bridge_election is not None:
+            background_tasks.append(asyncio.create_task(bridge_election.run()))
+
         yield
 
+        for task in background_tasks:
+            task.cancel()
+        # Let them stop (e.g. an in-flight flush) before the final flushes
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        await heartbeats.flush()
+        await event_outbox.flush()
+        await sweeper_election.close()
+        await bridge.close()
+        if bridge_election is not None:
+            await bridge_election.close()
+
     # Clean up
-    await pg_connection.remove_listener("game_updated", on_game_change)
-    await pg_connection.close()
     await nats_connection.close()
@@ -63,11 +63,24 @@ app.mount(
 # 4. Add templates
 app.add_templates(
     directory=settings.TEMPLATES_DIR,
+    # Templates are edited (and reloaded) while developing - always compile from source
+    compiled_directory=None if settings.DEBUG else settings.TEMPLATES_COMPILED_DIR,
+    # Production: compile before serving, and never check templates for changes
+    warm_up=settings.ENVIRONMENT == "production",
+    auto_reload=settings.DEBUG,
+    # Reloaded templates would still be served from cached fragments
+    fragment_cache_size=(
+        0 if settings.DEBUG else settings.TEMPLATE_FRAGMENT_CACHE_MAX_ENTRIES
+    ),
     globals={
         "GameStatus": enums.GameStatus,
+        "GAME_TRANSPORT": settings.GAME_TRANSPORT,
         "now": datetime.now,
     },
 )
 
 # 5. Include routers
 app.include_router(routes.router)
+
+# 6. Compile the route table for url_for() (after all routes are added)
+app.compile_url_table(base_url=settings.BASE_URL)
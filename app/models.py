@@ -1,11 +1,8 @@
 from typing import Self
 
-import string
-import random
-
 from enum import Enum
 
-from tortoise import Model
+from tortoise import Model, timezone
 from tortoise.fields import (
     IntField,
     DatetimeField,
@@ -18,14 +15,11 @@ from tortoise.fields import (
     CASCADE,
 )
 
+from app.codes import game_codes
+from app.outbox import event_outbox
 from app.tortoise_lifecycle import LifecycleMixin, after_create, after_update
 
 
-def generate_unique_game_code():
-    """Generates a short, unique 4-character code using uppercase letters."""
-    return "".join(random.choices(string.ascii_uppercase, k=4))
-
-
 class BaseModel(LifecycleMixin, Model):
     """Base model with timestamps."""
 
@@ -64,7 +58,10 @@ class Game(BaseModel):
         ABORTED = "ABORTED"
 
     status = CharEnumField(Status, default=Status.IN_LOBBY, max_length=20)
-    code = CharField(max_length=4, unique=True, default=generate_unique_game_code)
+    code = CharField(max_length=4, index=True)
+    """Unique among active games only - codes are reused after games end (see `game_codes`)."""
+    version = IntField(default=0)
+    """Bumped by database triggers on every change to the game or its connections."""
 
     # Relationships
     host = ForeignKeyField(
@@ -88,6 +85,30 @@ class Game(BaseModel):
     def is_finished(self) -> bool:
         return self.status in [Game.Status.FINISHED, Game.Status.ABORTED]
 
+    @property
+    def connected_players(self) -> list[Player]:
+        """Players with an active connection (requires `connections__player` to be prefetched)."""
+        return [
+            connection.player for connection in self.connections if connection.is_active
+        ]
+
+    @classmethod
+    async def create(cls, using_db=None, **kwargs) -> Self:
+        """Create a game, with a newly allocated code unless one is given."""
+        if "code" not in kwargs:
+            kwargs["code"] = await game_codes.next()
+        return await super().create(using_db=using_db, **kwargs)
+
+    @classmethod
+    async def get_by_code(cls, code: str) -> Self | None:
+        """Get the latest game by code, with its host and player connections prefetched."""
+        return (
+            await cls.filter(code=code.upper())
+            .order_by("-id")
+            .first()
+            .prefetch_related("host", "connections__player")
+        )
+
     async def add_player(self, player: Player) -> None:
         """Add a player to the game."""
         await PlayerGameConnection.create(player=player, game=self)
@@ -96,6 +117,11 @@ class Game(BaseModel):
         """Set the host of the game."""
         self.host = player
 
+    async def start(self) -> None:
+        """Move the game out of the lobby."""
+        self.status = Game.Status.IN_PROGRESS
+        await self.save(update_fields=["status", "updated_at"])
+
 
 class PlayerGameConnection(BaseModel):
     """
@@ -120,32 +146,33 @@ class PlayerGameConnection(BaseModel):
     events: ReverseRelation["Event"]
 
     class Meta:
+        # Table from the migrations, which its triggers and indexes are defined on
+        table = "connection"
         unique_together = (("player", "game"),)
 
-    @after_create
-    async def create_player_joined_event(self):
-        await Event.create(
-            event_type=Event.Type.PLAYER_JOINED,
-            game=self.game,
-            player=self.player,
-        )
+    @after_create(transactional=True)
+    async def create_player_joined_event(self, using_db):
+        # Written right away, in the same commit as the join - one notification, one refresh
+        await self._event(Event.Type.PLAYER_JOINED).save(using_db=using_db)
 
     @after_update(fields=["is_active"])
     async def create_connection_event(self, previous: Self):
         if not previous.is_active and self.is_active:
-            # Player reconnected
-            await Event.create(
-                event_type=Event.Type.PLAYER_RECONNECTED,
-                game=self.game,
-                player=self.player,
-            )
+            # Player reconnected (written later, in bulk)
+            event_outbox.add(self._event(Event.Type.PLAYER_RECONNECTED))
         elif previous.is_active and not self.is_active:
             # Player disconnected
-            await Event.create(
-                event_type=Event.Type.PLAYER_DISCONNECTED,
-                game=self.game,
-                player=self.player,
-            )
+            event_outbox.add(self._event(Event.Type.PLAYER_DISCONNECTED))
+
+    def _event(self, event_type: "Event.Type") -> "Event":
+        # Dated now, so it's ordered by when it happened even if queued in `EventOutbox`
+        return Event(
+            created_at=timezone.now(),
+            event_type=event_type,
+            game_id=self.game_id,
+            player_id=self.player_id,
+            connection_id=self.id,
+        )
 
 
 class Event(BaseModel):
@@ -181,6 +208,10 @@ class Event(BaseModel):
         on_delete=SET_NULL,
     )
 
+    class Meta:
+        # Not by id - queued events are inserted after those written right away
+        ordering = ["created_at", "id"]
+
 
 # # class Photo(BaseModel, table=True):
 # #     """
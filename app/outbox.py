@@ -0,0 +1,108 @@
+"""
+Deferred, batched inserts of `Event` rows.
+"""
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from app.models import Event
+
+logger = logging.getLogger(__name__)
+
+
+class EventOutbox:
+    """
+    Collects `Event` rows produced by lifecycle hooks and writes them in one bulk INSERT.
+
+    Requests only queue their events, so joining or reconnecting doesn't wait for an extra
+    INSERT round trip. Events are written in the order they were added (one flush at a
+    time), so events of a game keep their insertion order within this worker only.
+
+    Across workers (and events written right away, e.g. by the sweeper), a game's events
+    are ordered by `created_at`, which is set when the event is queued - see `Event.Meta`.
+
+    If the bulk INSERT fails, the events are retried one by one: an event that fails
+    `max_attempts` times is dropped (and logged), so one bad row can't block the others.
+    At most `max_pending` events are queued, the oldest are dropped beyond that.
+
+    Example:
+        event_outbox.add(Event(event_type=Event.Type.PLAYER_JOINED, game_id=game.id))
+    """
+
+    def __init__(
+        self, *, flush_interval: float, max_attempts: int = 3, max_pending: int = 10_000
+    ):
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.max_pending = max_pending
+        self._pending: list["Event"] = []
+        self._attempts: dict[int, int] = {}
+        """Failed writes per queued event (by id())."""
+        self._lock = asyncio.Lock()
+
+    def add(self, event: "Event") -> None:
+        """Queue an event for the next flush."""
+        self._pending.append(event)
+        self._drop_overflow()
+
+    async def flush(self) -> None:
+        """Write all queued events in a single statement."""
+        from app.models import Event  # Models queue their events here
+
+        async with self._lock:
+            if not self._pending:
+                return
+
+            pending, self._pending = self._pending, []
+            try:
+                await Event.bulk_create(pending)
+            except Exception:
+                logger.exception("Writing %d events failed", len(pending))
+                failed = await self._write_each(pending)
+                # Keep them (ahead of newer ones) for the next attempt
+                self._pending[:0] = failed
+                self._drop_overflow()
+            else:
+                self._attempts.clear()
+
+    async def run(self) -> None:
+        """Flush queued events every `flush_interval` seconds (until cancelled)."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing events failed")
+
+    async def _write_each(self, events: list["Event"]) -> list["Event"]:
+        """Write events one at a time. Returns those to retry."""
+        retry = []
+        for event in events:
+            try:
+                await event.save()
+            except Exception:
+                attempts = self._attempts.pop(id(event), 0) + 1
+                if attempts < self.max_attempts:
+                    self._attempts[id(event)] = attempts
+                    retry.append(event)
+                else:
+                    logger.exception("Dropping event after %d attempts", attempts)
+            else:
+                self._attempts.pop(id(event), None)
+        return retry
+
+    def _drop_overflow(self) -> None:
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            for event in self._pending[:overflow]:
+                self._attempts.pop(id(event), None)
+            del self._pending[:overflow]
+            logger.warning("Event outbox full - dropped the %d oldest events", overflow)
+
+
+event_outbox = EventOutbox(flush_interval=settings.EVENT_OUTBOX_FLUSH_INTERVAL)
+"""Outbox used by the model hooks (one per worker)."""
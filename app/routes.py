@@ -1,8 +1,42 @@
-from fastapi import APIRouter, Header, Form, Depends
-from starlette.responses import RedirectResponse
+import asyncio
+import copy
+import json
+from dataclasses import asdict
 
-from app.deps import get_session_id
-from app.fasthtml import render, url_for
+from fastapi import (
+    APIRouter,
+    Header,
+    Form,
+    Depends,
+    HTTPException,
+    Request,
+    WebSocket,
+)
+from sse_starlette import EventSourceResponse
+from starlette.responses import (
+    HTMLResponse,
+    JSONResponse,
+    RedirectResponse,
+    Response,
+)
+
+from app.config import settings
+from app.deps import (
+    find_player_connection,
+    get_session_id,
+    get_player_cache,
+    get_current_game,
+    get_current_player,
+    get_current_player_connection,
+    get_game_cache,
+    get_game_hub,
+    get_heartbeat_buffer,
+)
+from app.fasthtml import render, render_stream, request_context, url_for
+from app.heartbeats import HeartbeatBuffer
+from app.hub import GameHub
+from app.cache import PLAYER_CHANGED_SUBJECT, GameCache, PlayerCache
+from app.models import Game, Player, PlayerGameConnection
 
 router = APIRouter()
 
@@ -20,7 +54,25 @@ async def home_page(session_id: str = Depends(get_session_id)):
         # Get active games
         # active_games = Game.filter(players)
 
-    return await render("index.html", {"active_games": active_games})
+    # Sent while rendering, so the browser can start on <head> early
+    return render_stream("index.html", {"active_games": active_games})
+
+
+@router.get("/health")
+async def health(request: Request):
+    """Health check with live update metrics (503 while this worker should forward updates but can't)."""
+
+    stats = request.app.state.bridge.stats
+
+    return JSONResponse(
+        {
+            "bridge": asdict(stats),
+            "game_cache": asdict(request.app.state.game_cache.stats),
+            "player_cache": asdict(request.app.state.player_cache.stats),
+            "fragment_cache": asdict(request.app.templates.env.fragment_cache.stats),
+        },
+        status_code=503 if stats.is_leader and not stats.connected else 200,
+    )
 
 
 @router.get("/create-player")
@@ -32,16 +84,26 @@ async def player_form(block_name: str = Header(None)):
 
 @router.post("/create-player")
 async def submit_player_form(
+    request: Request,
     session_id: str = Depends(get_session_id),
+    player_cache: PlayerCache = Depends(get_player_cache),
+    game_cache: GameCache = Depends(get_game_cache),
     name: str = Form(...),
     avatar: int = Form(1),
 ):
-    """Creates player and redirects to homepage."""
+    """Creates (or updates) player and redirects to homepage."""
 
-    Player.get_or_create(
+    player, _ = await Player.update_or_create(
+        defaults={"name": name, "avatar": avatar},
         session_id=session_id,
-        name=name,
-        avatar=avatar,
+    )
+
+    # Drop the old name/avatar here and on the other workers
+    player_cache.invalidate(session_id)
+    game_cache.invalidate_player(player.id)
+    await request.app.state.nats_connection.publish(
+        PLAYER_CHANGED_SUBJECT,
+        json.dumps({"session_id": session_id, "player_id": player.id}).encode(),
     )
 
     return RedirectResponse(
@@ -51,7 +113,7 @@ async def submit_player_form(
 
 
 @router.post("/create")
-async def create_game(player: Player = Depends(get_player_from_session)):
+async def create_game(player: Player = Depends(get_current_player)):
     """Create game, add player as host, and redirect to game page."""
 
     game = await Game.create()
@@ -63,7 +125,7 @@ async def create_game(player: Player = Depends(get_player_from_session)):
     await game.save()
 
     return RedirectResponse(
-        url=url_for("game_page", game_code=game.code),
+        url=url_for("get_game", game_code=game.code),
         status_code=302,
     )
 
@@ -82,137 +144,152 @@ async def join_game(
         )
 
     # Check if player is already in this game
-    existing_connection = find_player_connection_by_session_key(
-        game, player.session_key
-    )
-    if existing_connection:
+    if find_player_connection(game, player):
         # Player already in game, just redirect
         return RedirectResponse(f"/{game.code}", status_code=302)
 
     # Create new connection and redirect
-    await create_player_connection(db, player=player, game=game)
+    await game.add_player(player)
     return RedirectResponse(f"/{game.code}", status_code=302)
 
 
 @router.get("/{game_code}", response_class=HTMLResponse)
 async def get_game(
-    request: Request,
-    player_connection: PlayerConnection = Depends(get_current_player_connection),
+    player_connection: PlayerGameConnection = Depends(get_current_player_connection),
 ):
     """Game detail page with current state."""
 
-    return templates.TemplateResponse(
+    return render_stream(
         "game.html",
         {
-            "request": request,
             "game": player_connection.game,
-            "current_player": player_connection.player,
+            "player": player_connection.player,
         },
     )
 
 
-# @app.post("/{game_code}/start")
-# async def start_game(
-#     game_code: str,
-#     db: AsyncSession = Depends(get_database_session),
-# ):
-#     """Start a new game round."""
-#     # Get game and current player
-#     # game = await get_game_by_code(db, code=game_code)
-#     # if not game:
-#     #     return HTMLResponse(content="No game found with that code.", status_code=404)
-#
-#     # current_player = await get_player_by_session(db, game=game, session_key=session_key)
-#     # if not current_player:
-#     #     return HTMLResponse(content="Player not found.", status_code=404)
-#     #
-#     # # Check if current player is the host
-#     # if current_player != game.host:
-#     #     return HTMLResponse(
-#     #         content="Only the host can start the game.", status_code=404
-#     #     )
-#
-#     # await start_new_turn(game.code)
-#
-#     # Start background task if not already running
-#     # if game.code not in _running_games:
-#     #     task = asyncio.create_task(run_game_in_background(game.code))
-#     #     _running_games[game.code] = task
-#
-#     # Clean up when task finishes
-#     # def cleanup(task):
-#     #     if game.code in _running_games:
-#     #         del _running_games[game.code]
-#
-#     # task.add_done_callback(cleanup)
-#
-#     await start_game_in_background(game_code, db=db)
-#
-#     return {"status": "OK"}
-#
-#
-#
-#
-# @app.get("/{game_code}/events")
-# async def get_game_events(
-#     request: Request,
-#     connection: PlayerConnection = Depends(get_current_player_connection),
-#     db: AsyncSession = Depends(get_database_session),
-#     nats_connection: NATS = Depends(get_nats_connection),
-# ):
-#     """HTMX SSE endpoint: Sends entire page HTML on NATS 'refresh' events."""
-#     queue = asyncio.Queue()
-#
-#     # Store values before entering async context to avoid detached instance errors
-#     game_code = connection.game.code
-#     player_session_key = connection.player.session_key
-#
-#     async def event_generator():
-#         async def nats_callback(msg):
-#             await queue.put("game_changed")
-#
-#         await nats_connection.subscribe(f"game.{game_code}", cb=nats_callback)
-#
-#         while True:
-#             await queue.get()  # Wait for game change event
-#
-#             db.expire_all()  # Ensure we get fresh data
-#
-#             # Get fresh game and player data
-#             fresh_game = await get_game_by_code(db, code=game_code)
-#             fresh_player = next(
-#                 (
-#                     conn.player
-#                     for conn in fresh_game.connections
-#                     if conn.player.session_key == player_session_key
-#                 ),
-#                 None,
-#             )
-#
-#             response = templates.TemplateResponse(
-#                 "game.html",
-#                 {
-#                     "request": request,
-#                     "game": fresh_game,
-#                     "current_player": fresh_player,
-#                 },
-#                 block_name="game_state",
-#             )
-#             html = response.body.decode()
-#             yield {"event": "refreshGame", "data": html}
-#
-#     return EventSourceResponse(event_generator())
-#
-#
-# @app.post("/{game_code}/heartbeat")
-# async def heartbeat(
-#     connection: PlayerConnection = Depends(get_current_player_connection),
-#     db: AsyncSession = Depends(get_database_session),
-# ):
-#     """Update connection's last heartbeat timestamp and check for inactive connections."""
-#
-#     await update_player_connection_heartbeat(db, connection=connection)
-#
-#     await mark_stale_connections_as_inactive(db, game=connection.game)
-#
-#     return Response(status_code=204)
+@router.post("/{game_code}/start")
+async def start_game(
+    connection: PlayerGameConnection = Depends(get_current_player_connection),
+):
+    """Start the game (host only)."""
+
+    if not is_host(connection):
+        raise HTTPException(status_code=403, detail="Only the host can start the game")
+
+    if connection.game.is_in_lobby:
+        await start_game_copy(connection.game)
+
+    return Response(status_code=204)
+
+
+@router.get("/{game_code}/events")
+async def get_game_events(
+    connection: PlayerGameConnection = Depends(get_current_player_connection),
+    hub: GameHub = Depends(get_game_hub),
+    heartbeats: HeartbeatBuffer = Depends(get_heartbeat_buffer),
+    version: int = 0,
+    last_event_id: str | None = Header(None),
+):
+    """
+    HTMX SSE endpoint: Sends the `game_state` block whenever the game changes.
+
+    The player counts as connected for as long as this stream is open.
+    """
+
+    # Version the client already shows (Last-Event-ID on reconnects, query param from the page)
+    client_version = (
+        int(last_event_id) if last_event_id and last_event_id.isdigit() else version
+    )
+
+    async def event_generator():
+        # Updates are shared with every other client of this game on this worker
+        async with heartbeats.track(connection):
+            async for game_version, event, html in hub.stream(
+                connection.game, connection.player, since_version=client_version
+            ):
+                yield {"event": event, "id": str(game_version), "data": html}
+
+    # Keepalive pings make dead connections (and so disconnects) show up quickly
+    return EventSourceResponse(event_generator(), ping=settings.SSE_PING_INTERVAL)
+
+
+@router.websocket("/{game_code}/ws")
+async def game_socket(
+    websocket: WebSocket,
+    connection: PlayerGameConnection = Depends(get_current_player_connection),
+    hub: GameHub = Depends(get_game_hub),
+    heartbeats: HeartbeatBuffer = Depends(get_heartbeat_buffer),
+    version: int = 0,
+):
+    """
+    HTMX WebSocket endpoint: Pushes the `game_state` block whenever the game changes,
+    and receives heartbeats and player actions (`{"action": ...}`) on the same connection.
+
+    The player counts as connected for as long as this socket is open.
+    """
+
+    await websocket.accept()
+
+    async def push_updates():
+        # Full refreshes are swapped by element id, patches out-of-band
+        async for _, _, html in hub.stream(
+            connection.game, connection.player, since_version=version
+        ):
+            await websocket.send_text(html)
+
+    async def receive_actions():
+        async for text in websocket.iter_text():
+            # Malformed frames are ignored, they don't close the socket
+            try:
+                message = json.loads(text)
+            except ValueError:
+                continue
+
+            # Valid JSON, but not an action object - ignore
+            if isinstance(message, dict):
+                await handle_game_action(connection, heartbeats, message.get("action"))
+
+    # Renders for this socket share one request context (HTTP middleware doesn't run here)
+    with request_context(websocket):
+        async with heartbeats.track(connection):
+            tasks = {
+                asyncio.create_task(push_updates()),
+                asyncio.create_task(receive_actions()),
+            }
+            try:
+                # Either side ending (client left, or a failed render/send) ends the socket
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            for task in done:
+                task.result()
+
+
+# Helpers
+def is_host(connection: PlayerGameConnection) -> bool:
+    return connection.game.host_id == connection.player_id
+
+
+async def start_game_copy(game: Game) -> None:
+    """Start the game without changing the (cached, shared) instance - the cache follows the change notification."""
+    await copy.copy(game).start()
+
+
+async def handle_game_action(
+    connection: PlayerGameConnection, heartbeats: HeartbeatBuffer, action: str | None
+) -> None:
+    """Handle an action sent over the game's WebSocket."""
+
+    match action:
+        case "heartbeat":
+            await heartbeats.record(connection)
+        case "start":
+            if is_host(connection) and connection.game.is_in_lobby:
+                await start_game_copy(connection.game)
+        case _:
+            # Unknown (or not yet supported, e.g. votes) - ignore
+            pass
@@ -0,0 +1,73 @@
+"""
+Background sweeper marking stale player connections as inactive.
+"""
+
+import asyncio
+import logging
+
+from tortoise import connections
+
+from app.leader import LeaderElection
+from app.models import Event, PlayerGameConnection
+
+logger = logging.getLogger(__name__)
+
+SWEEPER_LOCK_KEY = 727_001
+"""Advisory lock key electing the worker that runs the sweeper."""
+
+
+class StaleConnectionSweeper:
+    """
+    Marks connections without a recent heartbeat as inactive, for all games at once.
+
+    Runs every `interval` seconds, but only on the elected worker.
+    """
+
+    def __init__(
+        self, election: LeaderElection, *, interval: float, stale_after: float
+    ):
+        self.election = election
+        self.interval = interval
+        self.stale_after = stale_after
+
+    async def sweep(self) -> int:
+        """Mark stale connections as inactive. Returns the number of connections marked."""
+        rows = await connections.get("default").execute_query_dict(
+            f"""
+            UPDATE {PlayerGameConnection._meta.db_table}
+            SET is_active = false, updated_at = NOW(), activity_changed_at = NOW()
+            WHERE is_active
+            AND last_heartbeat < NOW() - make_interval(secs => $1)
+            RETURNING id, game_id, player_id
+            """,
+            [self.stale_after],
+        )
+
+        # Bulk update skips the lifecycle hooks - create their events here
+        if rows:
+            await Event.bulk_create(
+                [
+                    Event(
+                        event_type=Event.Type.PLAYER_DISCONNECTED,
+                        game_id=row["game_id"],
+                        player_id=row["player_id"],
+                        connection_id=row["id"],
+                    )
+                    for row in rows
+                ]
+            )
+
+        return len(rows)
+
+    async def run(self) -> None:
+        """Sweep every `interval` seconds while this worker is the leader (until cancelled)."""
+        while True:
+            await asyncio.sleep(self.interval)
+
+            if not self.election.is_leader:
+                continue
+
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Sweeping stale connections failed")
@@ -1,17 +1,57 @@
 from functools import partial
+from typing import Any, Callable, Self
+import inspect
+from tortoise import Model
+from tortoise.signals import Signals
+from tortoise.transactions import in_transaction
 
-from copy import deepcopy
 
-from typing import Callable, Self
-import inspect
-from tortoise.signals import pre_save, post_save, pre_delete, post_delete, Signals
+HOOK_TYPES = (
+    "before_create",
+    "after_create",
+    "before_update",
+    "after_update",
+    "before_delete",
+    "after_delete",
+)
 
 
-async def call_sync_or_async(method: Callable, **kwargs):
+async def call_sync_or_async(method: Callable, *args, **kwargs):
     if inspect.iscoroutinefunction(method):
-        return await method(**kwargs)
+        return await method(*args, **kwargs)
     else:
-        return method(**kwargs)
+        return method(*args, **kwargs)
+
+
+class FieldSnapshot:
+    """
+    Values of the watched fields of an instance, as last loaded from / saved to the database.
+
+    Passed to hooks as `previous`. Supports the same attribute access as the instance for
+    snapshotted fields, including related ones (`previous.player.name`).
+    """
+
+    __slots__ = ("_values", "_prefix")
+
+    def __init__(self, values: dict[str, Any], prefix: str = ""):
+        self._values = values
+        self._prefix = prefix
+
+    def __getattr__(self, name: str) -> Any:
+        key = self._prefix + name
+        if key in self._values:
+            return self._values[key][-1]
+
+        # Related instance, e.g. `player` of "player.name"
+        nested = key + "."
+        if any(field.startswith(nested) for field in self._values):
+            return FieldSnapshot(self._values, nested)
+
+        raise AttributeError(f"Field {key!r} was not snapshotted")
+
+    def get(self, field_name: str, default: Any = None) -> tuple | None:
+        """Raw snapshot entry of a field (see `LifecycleMixin._snapshot_value`)."""
+        return self._values.get(field_name, default)
 
 
 class LifecycleMixin:
@@ -31,8 +71,28 @@ class LifecycleMixin:
       @after_update     - Runs after instance is updated
       @before_delete    - Runs before instance is deleted
       @after_delete     - Runs after instance is deleted
+
+    Update hooks see the previous state as a `FieldSnapshot` of only the fields they watch
+    (all data fields if a hook asks for `previous` without watching specific fields),
+    recorded when the instance is loaded and after every save.
+
+    After-hooks run once the save is committed, unless marked `transactional=True`: then
+    the save and those hooks share one transaction (passed to hooks taking `using_db`), so
+    their writes commit - and notify - together. Other after-hooks still wait for the commit.
     """
 
+    _lifecycle_hooks: dict[str, tuple[Callable, ...]] = {}
+    """Decorated methods by hook type, built once per model class."""
+
+    _snapshot_fields: set[str] | None = None
+    """Fields to snapshot (None: no update hooks, empty: all data fields)."""
+
+    _watched_columns: set[str] | None = None
+    """Columns any update hook watches (None: a hook runs on every update)."""
+
+    _transactional_hooks: dict[str, tuple[Callable, ...]] = {}
+    """After-hooks that run in the transaction of the save, by hook type."""
+
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
 
@@ -40,179 +100,169 @@ class LifecycleMixin:
         if cls.__name__ in ("LifecycleMixin", "Model"):
             return
 
-        hooks: dict[str, list[Callable]] = {
-            "before_create": [],
-            "after_create": [],
-            "before_update": [],
-            "after_update": [],
-            "before_delete": [],
-            "after_delete": [],
+        # Dispatch table: hook type -> methods with its _run_{hook_type} flag
+        cls._lifecycle_hooks = {
+            hook_type: tuple(
+                method
+                for method in cls.__dict__.values()
+                if hasattr(method, f"_run_{hook_type}")
+            )
+            for hook_type in HOOK_TYPES
         }
 
-        # Find _run_{hook_type} flags on methods
-        for method in cls.__dict__.values():
-            for hook_type in hooks:
-                if hasattr(method, f"_run_{hook_type}"):
-                    hooks[hook_type].append(method)
+        update_hooks = (
+            cls._lifecycle_hooks["before_update"] + cls._lifecycle_hooks["after_update"]
+        )
+        cls._snapshot_fields = _fields_to_snapshot(update_hooks)
+        cls._watched_columns = _columns_to_watch(update_hooks)
+        cls._transactional_hooks = {
+            hook_type: tuple(
+                method
+                for method in cls._lifecycle_hooks[hook_type]
+                if getattr(method, "_transactional", False)
+            )
+            for hook_type in ("after_create", "after_update")
+        }
 
-        cls._connect_to_tortoise_signals(hooks)
+        cls._connect_to_tortoise_signals()
 
     @classmethod
-    def _connect_to_tortoise_signals(cls, hooks: dict[str, list[Callable]]):
+    def _connect_to_tortoise_signals(cls):
         """
-        Connect the hooks to Tortoise's signals (pre_save, post_save, pre_delete, post_delete).
+        Connect the dispatch table to Tortoise's signals (pre_save, post_save, pre_delete, post_delete).
+
+        One listener per signal, and only for signals with hooks.
         """
+        hooks = cls._lifecycle_hooks
 
-        if hooks["before_create"]:
+        if hooks["before_create"] or hooks["before_update"]:
+            cls.register_listener(Signals.pre_save, _dispatch_pre_save)
 
-            async def before_create_handler(sender, instance, using_db, update_fields):
-                if instance.pk is None:  # Is being created
-                    for method in hooks["before_create"]:
-                        await call_sync_or_async(method, instance=instance)
+        if hooks["after_create"] or hooks["after_update"]:
+            cls.register_listener(Signals.post_save, _dispatch_post_save)
 
-            cls.register_listener(Signals.pre_save, before_create_handler)
+        if hooks["before_delete"]:
+            cls.register_listener(Signals.pre_delete, _dispatch_pre_delete)
 
-        if hooks["after_create"]:
+        if hooks["after_delete"]:
+            cls.register_listener(Signals.post_delete, _dispatch_post_delete)
 
-            async def after_create_handler(
-                sender, instance, created, using_db, update_fields
-            ):
-                if created:  # Was created
-                    for method in hooks["after_create"]:
-                        await call_sync_or_async(method, instance=instance)
-
-            cls.register_listener(Signals.post_save, after_create_handler)
-
-        if hooks["before_update"] or hooks["after_update"]:
-            # Updates are still special but follow same pattern
-            async def before_update_handler(sender, instance, using_db, update_fields):
-                if instance.pk is not None:
-                    for method in hooks["before_update"]:
-                        # field checking logic here
-                        await call_sync_or_async(method, previous=deepcopy(instance))
-
-            async def after_update_handler(
-                sender, instance, created, using_db, update_fields
-            ):
-                if not created:
-                    previous = getattr(instance, "_previous_state", None)
-                    for method in hooks["after_update"]:
-                        # field checking logic here
-                        await call_sync_or_async(method, instance=instance)
-                    if hasattr(instance, "_previous_state"):
-                        del instance._previous_state
-
-            if hooks["before_update"]:
-                cls.register_listener(Signals.pre_save, before_update_handler)
-            if hooks["after_update"]:
-                cls.register_listener(Signals.post_save, after_update_handler)
+    @classmethod
+    def _init_from_db(cls, **kwargs) -> Self:
+        instance = super()._init_from_db(**kwargs)
+        if cls._snapshot_fields is not None:
+            instance._take_snapshot()
+        return instance
 
-        if hooks["before_delete"]:
-            cls.register_listener(
-                signal=Signals.pre_delete,
-                listener=partial(
-                    _call_methods_if_condition,
-                    condition=True,  # Always run on delete
-                    methods=hooks["before_delete"],
-                ),
-            )
+    @classmethod
+    async def create(cls, using_db=None, **kwargs) -> Self:
+        if cls._transactional_hooks["after_create"] and using_db is None:
+            # Tortoise would pass its default connection, bypassing the transaction in `save`
+            instance = cls(**kwargs)
+            await instance.save(force_create=True)
+            return instance
+        return await super().create(using_db=using_db, **kwargs)
+
+    async def save(
+        self, using_db=None, update_fields=None, force_create=False, force_update=False
+    ) -> None:
+        deferred = []
+        kwargs = dict(
+            update_fields=update_fields,
+            force_create=force_create,
+            force_update=force_update,
+        )
+
+        creating = force_create or not (self._saved_in_db or force_update)
+        if using_db is None and self._needs_transaction(creating, update_fields):
+            # Transactional after-hooks run inside, the others are deferred until committed
+            self._deferred_hooks = deferred
+            try:
+                async with in_transaction() as connection:
+                    await super().save(using_db=connection, **kwargs)
+            finally:
+                del self._deferred_hooks
+        else:
+            await super().save(using_db=using_db, **kwargs)
+
+        # Hooks (run by the save signals) compare against the state before this save
+        if self._snapshot_fields is not None:
+            self._take_snapshot()
+
+        for call in deferred:
+            await call()
+
+    def _needs_transaction(
+        self, creating: bool, update_fields: list[str] | None
+    ) -> bool:
+        """Whether a transactional after-hook will run for this save (only then is one opened)."""
+        if creating:
+            return bool(self._transactional_hooks["after_create"])
 
-        if hooks["after_delete"]:
-            cls.register_listener(
-                signal=Signals.post_delete,
-                listener=partial(
-                    _call_methods_if_condition,
-                    condition=True,  # Always run on delete
-                    methods=hooks["after_delete"],
-                ),
+        hooks = self._transactional_hooks["after_update"]
+        if not hooks:
+            return False
+
+        previous = self._previous_snapshot()
+        if not self._update_is_relevant(update_fields, previous):
+            return False
+
+        return any(
+            not hasattr(method, "_fields_to_watch")
+            or any(
+                self._field_has_changed(field, previous)
+                for field in method._fields_to_watch
             )
+            for method in hooks
+        )
+
+    def _take_snapshot(self) -> None:
+        fields = self._snapshot_fields or self._meta.fields_db_projection.keys()
+        values = {}
+        for field_name in fields:
+            value = self._snapshot_value(field_name)
+            if value is not None:
+                values[field_name] = value
+        self._lifecycle_snapshot = FieldSnapshot(values)
+
+    def _previous_snapshot(self) -> FieldSnapshot | None:
+        return getattr(self, "_lifecycle_snapshot", None)
+
+    def _snapshot_value(self, field_name: str) -> tuple | None:
+        """
+        Snapshot entry of a field: (value,) for simple fields, (related pk, value) for
+        related fields like "user.email", or None if the related instance isn't loaded.
+        """
+        if "." not in field_name:
+            return (getattr(self, field_name, None),)
 
-        # if hooks["before_update"]:
-        #     pass
-        #
-        # if hooks["after_update"]:
-        #     pass
+        fk_field, related_field = field_name.split(".", 1)
+        related = getattr(self, fk_field, None)
+        if related is None:
+            return (None, None)
+        if not isinstance(related, Model):
+            return None  # Not fetched - would need a query
 
-        if hooks["before_update"] or hooks["after_update"]:
-            # Find methods that need previous state
-            methods_needing_previous = [
-                method
-                for method in hooks["before_update"] + hooks["after_update"]
-                if getattr(method, "_need_previous_state", False)
-            ]
-
-            if hooks["before_update"]:
-
-                @pre_save(cls)
-                async def call_before_update_methods(
-                    sender, instance, using_db, update_fields
-                ):
-                    """
-                    When instance is being updated (has primary key):
-                      -> Call all methods decorated with @before_update
-
-                    Runs automatically on pre_save.
-                    """
-
-                    is_being_updated = instance.pk is not None
-                    if is_being_updated:
-                        if methods_needing_previous and getattr(
-                            instance, "_saved_in_db", False
-                        ):
-                            previous_states[id(instance)] = deepcopy(instance)
-
-                        for method in hooks["before_update"]:
-                            await cls._call_update_method(
-                                method, instance, previous_states.get(id(instance))
-                            )
-
-            if hooks["after_update"]:
-
-                @post_save(cls)
-                async def call_after_update_methods(
-                    sender, instance, created, using_db, update_fields
-                ):
-                    """
-                    When instance was updated (has primary key & `created` flag is False):
-                      -> Call all methods decorated with @after_update
-
-                    Runs automatically on post_save.
-                    """
-                    if not created:
-                        previous = previous_states.pop(id(instance), None)
-                        for method in hooks["after_update"]:
-                            await cls._call_update_method(method, instance, previous)
-
-            if hooks["before_delete"]:
-
-                @pre_delete(cls)
-                async def call_before_delete_methods(sender, instance, using_db):
-                    """
-                    When instance is being deleted:
-                      -> Call all methods decorated with @before_delete
-
-                    Runs automatically on pre_delete.
-                    """
-
-                    for method in hooks["before_delete"]:
-                        await call_sync_or_async(method, instance=instance)
-
-            if hooks["after_delete"]:
-
-                @post_delete(cls)
-                async def call_after_delete_methods(sender, instance, using_db):
-                    """
-                    When instance was deleted:
-                      -> Call all methods decorated with @after_delete
-
-                    Runs automatically on post_delete.
-                    """
-
-                    for method in hooks["after_delete"]:
-                        await call_sync_or_async(method, instance=instance)
+        return related.pk, getattr(related, related_field, None)
+
+    def _update_is_relevant(
+        self, update_fields: list[str] | None, previous: FieldSnapshot | None
+    ) -> bool:
+        """Fast path: whether any update hook could be interested in this save."""
+        watched = self._watched_columns
+        if watched is None:
+            return True
+
+        # Partial save, e.g. `save(update_fields=["last_heartbeat"])`
+        if update_fields:
+            return not watched.isdisjoint(update_fields)
+
+        return any(
+            self._field_has_changed(field, previous) for field in self._snapshot_fields
+        )
 
     @classmethod
-    async def _call_update_method(cls, method, instance, previous=None):
+    async def _call_update_method(cls, method, instance, previous=None, using_db=None):
         """Call an update method with field checking and previous state."""
         # Skip if watched fields haven't changed
         if hasattr(method, "_fields_to_watch"):
@@ -222,65 +272,90 @@ class LifecycleMixin:
             ):
                 return
 
-        # Pass previous instance if method wants it
+        # Pass previous state if method wants it (as `previous` or `previous_self`)
         kwargs = {}
-        if previous is not None and getattr(method, "_needs_previous", False):
-            kwargs["previous"] = previous
+        if previous is not None and (param := getattr(method, "_needs_previous", None)):
+            kwargs[param] = previous
 
-        await call_sync_or_async(method, instance=instance, **kwargs)
+        await _call_hook(method, instance, using_db, **kwargs)
 
     def _field_has_changed(
-        self, field_name: str, previous_instance: Self = None
+        self, field_name: str, previous: FieldSnapshot | None = None
     ) -> bool:
-        """Check if field changed compared to previous instance state."""
+        """Check if field changed compared to the snapshot of the previous state."""
 
-        if not previous_instance:
+        if previous is None:
             return False
 
-        # Simple field like "email"
-        if "." not in field_name:
-            current_value = getattr(self, field_name, None)
-            previous_value = getattr(previous_instance, field_name, None)
-            return current_value != previous_value
+        # Related fields change with their FK, e.g. "user.email" when "user" changes
+        before = previous.get(field_name)
+        after = self._snapshot_value(field_name)
+        if before is None or after is None:
+            return False  # Not known (related instance not loaded)
 
-        # Nested field like "user.email"
-        fk_field, related_field = field_name.split(".", 1)
+        return before != after
 
-        # If FK changed, related field changed too
-        if self._field_has_changed(
-            field_name=fk_field, previous_instance=previous_instance
-        ):
-            return True
 
-        current_fk = getattr(self, fk_field, None)
-        previous_fk = getattr(previous_instance, fk_field, None)
+async def _dispatch_pre_save(sender, instance, using_db, update_fields):
+    """Run @before_create or (relevant) @before_update hooks."""
+    hooks = sender._lifecycle_hooks
+
+    if instance.pk is None:  # Is being created
+        for method in hooks["before_create"]:
+            await call_sync_or_async(method, instance)
+
+    elif hooks["before_update"]:
+        previous = instance._previous_snapshot()
+        if instance._update_is_relevant(update_fields, previous):
+            for method in hooks["before_update"]:
+                await sender._call_update_method(method, instance, previous)
+
+
+async def _dispatch_post_save(sender, instance, created, using_db, update_fields):
+    """Run @after_create or (relevant) @after_update hooks."""
+    hooks = sender._lifecycle_hooks
+
+    deferred = getattr(instance, "_deferred_hooks", None)
+
+    if created:
+        for method in hooks["after_create"]:
+            call = partial(_call_hook, method, instance, using_db)
+            await _run_or_defer(method, call, deferred)
+
+    elif hooks["after_update"]:
+        previous = instance._previous_snapshot()
+        if instance._update_is_relevant(update_fields, previous):
+            for method in hooks["after_update"]:
+                call = partial(
+                    sender._call_update_method, method, instance, previous, using_db
+                )
+                await _run_or_defer(method, call, deferred)
+
 
-        # Same FK object? Check related field
-        if current_fk and previous_fk:
-            current_pk = getattr(current_fk, "pk", None)
-            previous_pk = getattr(previous_fk, "pk", None)
-            if current_pk == previous_pk:
-                current_related = getattr(current_fk, related_field, None)
-                previous_related = getattr(previous_fk, related_field, None)
-                return current_related != previous_related
+async def _call_hook(method: Callable, instance, using_db, **kwargs):
+    if getattr(method, "_needs_using_db", False):
+        kwargs["using_db"] = using_db
+    await call_sync_or_async(method, instance, **kwargs)
 
-        return False
 
+async def _run_or_defer(
+    method: Callable, call: Callable, deferred: list[Callable] | None
+) -> None:
+    # Inside a transaction opened for transactional hooks - others wait for the commit
+    if deferred is not None and not getattr(method, "_transactional", False):
+        deferred.append(call)
+    else:
+        await call()
+
+
+async def _dispatch_pre_delete(sender, instance, using_db):
+    for method in sender._lifecycle_hooks["before_delete"]:
+        await call_sync_or_async(method, instance)
 
-async def _call_methods_if_condition(
-    sender,
-    instance,
-    using_db,
-    update_fields,
-    methods: list[Callable],
-    condition: bool,
-    created: bool = None,
-):
-    """Call methods if condition is True."""
 
-    if condition:
-        for method in methods:
-            await call_sync_or_async(method, instance=instance)
+async def _dispatch_post_delete(sender, instance, using_db):
+    for method in sender._lifecycle_hooks["after_delete"]:
+        await call_sync_or_async(method, instance)
 
 
 def before_create(func: Callable) -> Callable:
@@ -299,10 +374,14 @@ def before_create(func: Callable) -> Callable:
     return func
 
 
-def after_create(func: Callable) -> Callable:
+def after_create(func: Callable = None, *, transactional: bool = False) -> Callable:
     """
     Decorate method to run automatically AFTER instance is CREATED (in database).
 
+    Extra features:
+      - Use `transactional=True` (in decorator) to run in the same transaction as the insert.
+      - Use `using_db` parameter (in method) to write within that transaction.
+
     Example:
         class MyModel(LifecycleMixin, Model):
             ...
@@ -310,10 +389,19 @@ def after_create(func: Callable) -> Callable:
             @after_create
             async def notify_after_creation(self):
                 print(f'Instance was created with ID {self.id}')
+
+            @after_create(transactional=True)
+            async def log_creation(self, using_db):
+                await Log.create(message=f'Created {self.id}', using_db=using_db)
     """
 
-    func._run_after_create = True
-    return func
+    def decorator(func: Callable) -> Callable:
+        func._run_after_create = True
+        func._transactional = transactional
+        func._needs_using_db = "using_db" in inspect.signature(func).parameters
+        return func
+
+    return decorator(func) if func is not None else decorator
 
 
 def before_update(fields: list[str] = None) -> Callable:
@@ -340,24 +428,22 @@ def before_update(fields: list[str] = None) -> Callable:
         if fields:
             func._fields_to_watch = set(fields)
 
-        if any(
-            p in inspect.signature(func).parameters
-            for p in ("previous", "previous_self")
-        ):
-            func._need_previous_state = True
+        func._needs_previous = _previous_param(func)
 
         return func
 
     return decorator
 
 
-def after_update(fields: list[str] = None):
+def after_update(fields: list[str] = None, *, transactional: bool = False):
     """
     Decorate method to run automatically AFTER instance is UPDATED (in database).
 
     Extra features:
       - Use `fields` parameter (in decorator) to only run when specific fields (including related fields, e.g. "user.email") change.
       - Use `previous` parameter (in method) to access instance's state before any changes.
+      - Use `transactional=True` (in decorator) to run in the same transaction as the update,
+        and `using_db` parameter (in method) to write within it.
 
     Example:
     class Player(LifecycleMixin, Model):
@@ -384,11 +470,9 @@ def after_update(fields: list[str] = None):
 
             func._fields_to_watch = set(fields)
 
-        elif any(
-            param in inspect.signature(func).parameters
-            for param in ("previous", "previous_self")
-        ):
-            func._wants_previous_state = True
+        func._needs_previous = _previous_param(func)
+        func._transactional = transactional
+        func._needs_using_db = "using_db" in inspect.signature(func).parameters
 
         return func
 
@@ -425,3 +509,40 @@ def after_delete(func: Callable) -> Callable:
     """
     func._run_after_delete = True
     return func
+
+
+def _fields_to_snapshot(methods: tuple[Callable, ...]) -> set[str] | None:
+    """Fields the update hooks need the previous value of (empty set: all data fields)."""
+    if not methods:
+        return None
+
+    fields = set()
+    for method in methods:
+        watched = getattr(method, "_fields_to_watch", None)
+        if watched is None and getattr(method, "_needs_previous", False):
+            return set()
+        fields |= watched or set()
+
+    return fields
+
+
+def _columns_to_watch(methods: tuple[Callable, ...]) -> set[str] | None:
+    """Columns whose update can trigger the update hooks (None: any update can)."""
+    columns = set()
+    for method in methods:
+        watched = getattr(method, "_fields_to_watch", None)
+        if watched is None:
+            return None
+
+        for field_name in watched:
+            # "user.email" -> the FK ("user", "user_id"); the related row isn't saved here
+            name = field_name.split(".", 1)[0]
+            columns |= {name, f"{name}_id"}
+
+    return columns
+
+
+def _previous_param(func: Callable) -> str | None:
+    """Name of the parameter taking the previous state, if any."""
+    parameters = inspect.signature(func).parameters
+    return next((p for p in ("previous", "previous_self") if p in parameters), None)